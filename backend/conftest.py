@@ -0,0 +1,21 @@
+"""
+Pytest configuration shared by the backend test modules.
+The suite can run across worker processes with `pytest -n auto --dist=loadgroup`.
+"""
+import os
+import pytest
+from dotenv import load_dotenv
+
+# Environment file for the Supabase credentials, overridable for other machines
+DOTENV_PATH = os.environ.get("DOTENV_PATH", '/Users/sreeramyashasviv/projects/MISC./AGENTIC-PLAYGROUND/.env')
+
+def pytest_configure(config):
+    """Load environment variables once, before any test module is imported."""
+    load_dotenv(DOTENV_PATH, override=False)
+    config.addinivalue_line("markers", "xdist_group(name): run grouped tests on the same xdist worker")
+
+def pytest_collection_modifyitems(config, items):
+    """Keep performance tests on a single xdist worker so their timings do not contend."""
+    for item in items:
+        if item.get_closest_marker("performance"):
+            item.add_marker(pytest.mark.xdist_group("perf-serial"))
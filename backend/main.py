@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-load_dotenv('/Users/sreeramyashasviv/projects/MISC./AGENTIC-PLAYGROUND/.env')
+load_dotenv('/Users/sreeramyashasviv/projects/MISC./AGENTIC-PLAYGROUND/.env', override=False)
 import sys
 import os as _os
 # Add vendored crewai package to path
@@ -107,12 +107,12 @@ async def health_check():
 async def database_diagnostics():
     """Detailed database diagnostics endpoint"""
     try:
+        # Force a connection check; the status below reuses its result
+        connection_active = database_service.check_connection(force=True)
+        
         # Get comprehensive database status
         db_status = database_service.get_connection_status()
         
-        # Force a connection check
-        connection_active = database_service.check_connection()
-        
         # Check if tables exist by trying simple queries
         tables_status = {}
         
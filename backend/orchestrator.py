@@ -7,7 +7,7 @@ from pydantic import BaseModel, ValidationError
 from utils.logging_utils import setup_json_logging, log_execution_time, MetricsLogger
 from utils.validation_utils import sanitize_numeric, validate_datetime
 from utils.transaction_utils import transaction_manager, FileResource, CleanupError
-from services.upload_service import upload_service
+from services.upload_service import upload_service, get_mime_type
 from services.csv_parser_service import csv_parser
 from crew_agents import DocumentAnalysisCrew
 import anthropic
@@ -66,20 +66,7 @@ class Orchestrator:
 
     def _get_file_type(self, filename: str) -> str:
         """Get file MIME type based on extension"""
-        extension = filename.lower().split('.')[-1] if '.' in filename else ''
-        mime_types = {
-            'pdf': 'application/pdf',
-            'txt': 'text/plain',
-            'csv': 'text/csv',
-            'doc': 'application/msword',
-            'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'xls': 'application/vnd.ms-excel',
-            'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'jpg': 'image/jpeg',
-            'jpeg': 'image/jpeg',
-            'png': 'image/png'
-        }
-        return mime_types.get(extension, 'application/octet-stream')
+        return get_mime_type(filename)
 
     @log_execution_time(logger)
     def create_request_context(self) -> str:
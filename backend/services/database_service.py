@@ -1,22 +1,44 @@
 import os
+import asyncio
 import json
 import logging
 import traceback
 import time
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-from supabase import create_client
+import httpx
+from supabase import create_client, ClientOptions
+from postgrest.exceptions import APIError
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import numpy as np
+import orjson
 import voyageai
 
-# Load environment variables
-load_dotenv('/Users/sreeramyashasviv/projects/MISC./AGENTIC-PLAYGROUND/.env')
+# Load environment variables; values already exported take precedence
+load_dotenv('/Users/sreeramyashasviv/projects/MISC./AGENTIC-PLAYGROUND/.env', override=False)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Minimum seconds between live connection probes while healthy
+HEARTBEAT_INTERVAL = 30
+
+# Shared HTTP/2 connection pool for the Supabase client
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+HTTP_TIMEOUT = httpx.Timeout(120.0)
+
+# Rows per bulk insert request, kept well under PostgREST payload limits
+BULK_INSERT_BATCH_SIZE = 500
+
+# document_chunks columns returned when the embedding is not needed
+CHUNK_COLUMNS = "id, document_id, chunk_index, content, metadata"
+
+# Server-side insert for uploads (see SUPABASE-DIAGNOSTICS.md) and the PostgREST
+# error code returned when it has not been created
+INSERT_UPLOAD_RPC = "insert_upload"
+MISSING_FUNCTION_CODE = "PGRST202"
+
 # Supabase configuration
 DEFAULT_SUPABASE_URL = "https://lgowncnnkdxptuvnsrvw.supabase.co"
 SUPABASE_URL = os.getenv("SUPABASE_URL", DEFAULT_SUPABASE_URL)
@@ -25,6 +47,9 @@ SUPABASE_URL = os.getenv("SUPABASE_URL", DEFAULT_SUPABASE_URL)
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Voyage AI key, read once rather than on every embedding call
+VOYAGE_API_KEY = os.getenv("VOYAGE_API_KEY")
+
 # Select which key to use (prefer service key for admin operations)
 SUPABASE_API_KEY = SUPABASE_SERVICE_KEY or SUPABASE_KEY
 
@@ -47,16 +72,21 @@ if not SUPABASE_API_KEY:
 else:
     logger.info(f"Using Supabase key type: {env_diagnostics['USING_KEY_TYPE']}")
 
+def _debug_traceback() -> Optional[str]:
+    """Format the current exception's traceback only when DEBUG logging is enabled"""
+    if logger.isEnabledFor(logging.DEBUG):
+        return traceback.format_exc()
+    return None
+
 def generate_embedding(text: str) -> list:
     """
     Generate embedding for the given text using Voyage AI.
     Requires VOYAGE_API_KEY to be set in the environment.
     """
     try:
-        voyage_api_key = os.getenv("VOYAGE_API_KEY")
-        if not voyage_api_key:
+        if not VOYAGE_API_KEY:
             raise RuntimeError("VOYAGE_API_KEY not set in environment.")
-        vo = voyageai.Client(api_key=voyage_api_key)
+        vo = voyageai.Client(api_key=VOYAGE_API_KEY)
         # Use 'voyage-3' as default model, input_type 'document' for doc, 'query' for queries
         # Here, we use 'document' for all, but you may want to distinguish in your app
         result = vo.embed([text], model="voyage-3", input_type="document")
@@ -120,6 +150,11 @@ class DatabaseService:
             last_checked=datetime.now(),
             env_diagnostics=env_diagnostics
         )
+        # Outcome and time of the last live query, shared by every caller
+        self._last_probe_ts = 0.0
+        self._last_probe_result = False
+        # Cleared once the server reports that the insert_upload function is missing
+        self._use_insert_rpc = True
         
         # Initialize connection
         self._initialize_connection()
@@ -152,9 +187,20 @@ class DatabaseService:
             
         # Attempt connection with retry
         for attempt in range(1, self.max_retries + 1):
+            http_client = None
             try:
                 logger.info(f"Connecting to Supabase (attempt {attempt}/{self.max_retries})...")
-                self.client = create_client(SUPABASE_URL, SUPABASE_API_KEY)
+                http_client = httpx.Client(
+                    http2=True,
+                    limits=HTTP_LIMITS,
+                    timeout=HTTP_TIMEOUT,
+                    follow_redirects=True
+                )
+                self.client = create_client(
+                    SUPABASE_URL,
+                    SUPABASE_API_KEY,
+                    options=ClientOptions(httpx_client=http_client)
+                )
                 
                 # Test connection with a simple query
                 test_response = self.client.table("uploads").select("id").limit(1).execute()
@@ -163,6 +209,7 @@ class DatabaseService:
                 self.status.is_connected = True
                 self.status.last_checked = datetime.now()
                 self.status.connection_attempts += 1
+                self._record_probe(True)
                 logger.info(f"Connected to Supabase successfully (attempt {attempt})")
                 return True
                 
@@ -171,7 +218,7 @@ class DatabaseService:
                     message=str(e),
                     error_type=type(e).__name__,
                     timestamp=datetime.now(),
-                    traceback=traceback.format_exc(),
+                    traceback=_debug_traceback(),
                     context={
                         "attempt": attempt,
                         "max_retries": self.max_retries,
@@ -181,7 +228,11 @@ class DatabaseService:
                 )
                 
                 logger.error(f"Failed to connect to Supabase (attempt {attempt}/{self.max_retries}): {e}")
-                logger.debug(f"Connection error traceback: {error_details.traceback}")
+                logger.debug("Connection error traceback: %s", error_details.traceback)
+                
+                # Release this attempt's connection pool before retrying
+                if http_client is not None:
+                    http_client.close()
                 
                 self.status.last_error = error_details
                 self.status.connection_attempts += 1
@@ -194,8 +245,35 @@ class DatabaseService:
         self.status.is_connected = False
         return False
     
-    def check_connection(self) -> bool:
-        """Check if database connection is alive with detailed diagnostics"""
+    @property
+    def last_known_good(self) -> bool:
+        """Whether a live query succeeded within the last HEARTBEAT_INTERVAL seconds"""
+        return (self.is_connected and self._last_probe_result
+                and time.time() - self._last_probe_ts < HEARTBEAT_INTERVAL)
+    
+    def _record_probe(self, result: bool):
+        """Record the outcome of a live query as the latest connection probe"""
+        self._last_probe_ts = time.time()
+        self._last_probe_result = result
+    
+    def _probe_if_stale(self, max_age: float = HEARTBEAT_INTERVAL) -> bool:
+        """Return True from cache if a query succeeded within max_age seconds, otherwise probe"""
+        if (self.is_connected and self.client and self._last_probe_result
+                and time.time() - self._last_probe_ts < max_age):
+            return True
+        return self.check_connection(force=True)
+    
+    def check_connection(self, force: bool = False) -> bool:
+        """
+        Check if database connection is alive with detailed diagnostics
+        
+        Any successful query in the last HEARTBEAT_INTERVAL seconds counts as
+        a heartbeat, so the connection is only re-probed once that has
+        elapsed, unless force is set.
+        """
+        if not force:
+            return self._probe_if_stale()
+        
         self.status.last_checked = datetime.now()
         
         if not self.is_connected or not self.client:
@@ -209,6 +287,7 @@ class DatabaseService:
             query_time = time.time() - start_time
             
             logger.info(f"Connection check successful (query time: {query_time:.3f}s)")
+            self._record_probe(True)
             self.status.successful_queries += 1
             self.is_connected = True
             self.status.is_connected = True
@@ -219,14 +298,15 @@ class DatabaseService:
                 message=str(e),
                 error_type=type(e).__name__,
                 timestamp=datetime.now(),
-                traceback=traceback.format_exc()
+                traceback=_debug_traceback()
             )
             
             logger.error(f"Database connection check failed: {e}")
-            logger.debug(f"Connection error traceback: {error_details.traceback}")
+            logger.debug("Connection error traceback: %s", error_details.traceback)
             
             self.status.last_error = error_details
             self.status.failed_queries += 1
+            self._record_probe(False)
             self.is_connected = False
             self.status.is_connected = False
             
@@ -256,9 +336,17 @@ class DatabaseService:
             status_dict["client_initialized"] = True
         else:
             status_dict["client_initialized"] = False
-            
+        status_dict["last_known_good"] = self.last_known_good
+        
         return status_dict
     
+    async def _run_db_operation(self, operation_name: str, func, *args, **kwargs) -> Tuple[bool, Any, Optional[ErrorDetails]]:
+        """
+        Run _handle_db_operation in a worker thread so the blocking Supabase client
+        does not stall the event loop
+        """
+        return await asyncio.to_thread(self._handle_db_operation, operation_name, func, *args, **kwargs)
+    
     def _handle_db_operation(self, operation_name: str, func, *args, **kwargs) -> Tuple[bool, Any, Optional[ErrorDetails]]:
         """
         Generic handler for database operations with error handling
@@ -288,8 +376,9 @@ class DatabaseService:
             result = func(*args, **kwargs)
             query_time = time.time() - start_time
             
-            logger.debug(f"{operation_name} completed in {query_time:.3f}s")
+            logger.debug("%s completed in %.3fs", operation_name, query_time)
             self.status.successful_queries += 1
+            self._record_probe(True)
             return True, result, None
             
         except Exception as e:
@@ -297,15 +386,16 @@ class DatabaseService:
                 message=str(e),
                 error_type=type(e).__name__,
                 timestamp=datetime.now(),
-                traceback=traceback.format_exc(),
+                traceback=_debug_traceback(),
                 context={"operation": operation_name}
             )
             
             logger.error(f"Error in {operation_name}: {e}")
-            logger.debug(f"Error traceback: {error_details.traceback}")
+            logger.debug("Error traceback: %s", error_details.traceback)
             
             self.status.last_error = error_details
             self.status.failed_queries += 1
+            self._record_probe(False)
             
             # Check if we should attempt reconnection
             if "not connected" in str(e).lower() or "connection" in str(e).lower():
@@ -328,13 +418,30 @@ class DatabaseService:
         }
         
         def _execute_store():
+            if self._use_insert_rpc:
+                try:
+                    response = self.client.rpc(INSERT_UPLOAD_RPC, {
+                        "fname": doc_data["filename"],
+                        "upath": doc_data["upload_path"],
+                        "ftype": doc_data["file_type"],
+                        "fsize": doc_data["file_size"]
+                    }).execute()
+                    if isinstance(response.data, int):
+                        return response.data
+                    raise ValueError(f"Store document response has no data: {response}")
+                except APIError as e:
+                    if e.code != MISSING_FUNCTION_CODE:
+                        raise
+                    logger.warning(f"Function {INSERT_UPLOAD_RPC} not found, falling back to table inserts")
+                    self._use_insert_rpc = False
+            
             response = self.client.table("uploads").insert(doc_data).execute()
             if hasattr(response, 'data') and response.data:
                 return response.data[0]['id']
             else:
                 raise ValueError(f"Store document response has no data: {response}")
         
-        success, result, error = self._handle_db_operation("store_document", _execute_store)
+        success, result, error = await self._run_db_operation("store_document", _execute_store)
         
         if success:
             document_id = result
@@ -344,6 +451,46 @@ class DatabaseService:
             logger.error(f"Failed to store document: {error.message if error else 'Unknown error'}")
             return -1
     
+    async def bulk_store_documents(self, metadatas: List[DocumentMetadata]) -> List[int]:
+        """
+        Store several document metadata rows with one insert per batch
+        Returns one document ID per input in order, with -1 for rows whose batch failed
+        """
+        async def _store_batch(batch: List[DocumentMetadata]) -> List[int]:
+            rows = [
+                {
+                    "filename": metadata.filename,
+                    "upload_path": metadata.upload_path,
+                    "file_type": metadata.file_type,
+                    "file_size": metadata.file_size
+                }
+                for metadata in batch
+            ]
+            
+            def _execute_store():
+                response = self.client.table("uploads").insert(rows).execute()
+                if hasattr(response, 'data') and len(response.data or []) == len(rows):
+                    return [row['id'] for row in response.data]
+                else:
+                    raise ValueError(f"Bulk store response does not match request: {response}")
+            
+            success, result, error = await self._run_db_operation("bulk_store_documents", _execute_store)
+            
+            if success:
+                logger.info(f"Stored {len(result)} documents in one batch")
+                return result
+            else:
+                logger.error(f"Failed to store document batch: {error.message if error else 'Unknown error'}")
+                return [-1] * len(batch)
+        
+        # Batches are independent, so send them concurrently; gather keeps input order
+        batches = [
+            metadatas[start:start + BULK_INSERT_BATCH_SIZE]
+            for start in range(0, len(metadatas), BULK_INSERT_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(_store_batch(batch) for batch in batches))
+        return [document_id for result in results for document_id in result]
+    
     async def store_document_chunk(self, chunk: DocumentChunk) -> bool:
         """
         Store a document chunk in the document_chunks table
@@ -364,7 +511,7 @@ class DatabaseService:
             else:
                 raise ValueError(f"Store chunk response has no data: {response}")
         
-        success, result, error = self._handle_db_operation("store_document_chunk", _execute_store)
+        success, result, error = await self._run_db_operation("store_document_chunk", _execute_store)
         
         if success:
             logger.info(f"Chunk stored for document ID: {chunk.document_id}, index: {chunk.chunk_index}")
@@ -373,6 +520,46 @@ class DatabaseService:
             logger.error(f"Failed to store document chunk: {error.message if error else 'Unknown error'}")
             return False
     
+    async def store_document_chunks(self, chunks: List[DocumentChunk]) -> bool:
+        """
+        Store a batch of document chunks in a single request.
+        The payload is encoded with orjson and posted through the PostgREST
+        session directly, bypassing the SDK's stdlib json serializer.
+        Returns True if successful
+        """
+        if not chunks:
+            return True
+        
+        rows = [
+            {
+                "document_id": chunk.document_id,
+                "chunk_index": chunk.chunk_index,
+                "content": chunk.content,
+                "embedding": chunk.embedding,
+                "metadata": chunk.metadata
+            }
+            for chunk in chunks
+        ]
+        
+        def _execute_store():
+            postgrest = self.client.postgrest
+            response = postgrest.session.post(
+                f"{self.client.rest_url}/document_chunks",
+                content=orjson.dumps(rows),
+                headers={**postgrest.headers, "Content-Type": "application/json", "Prefer": "return=minimal"}
+            )
+            response.raise_for_status()
+            return True
+        
+        success, result, error = await self._run_db_operation("store_document_chunks", _execute_store)
+        
+        if success:
+            logger.info(f"Stored {len(chunks)} chunks for document ID: {chunks[0].document_id}")
+            return True
+        else:
+            logger.error(f"Failed to store document chunks: {error.message if error else 'Unknown error'}")
+            return False
+    
     async def get_all_documents(self) -> List[Dict[str, Any]]:
         """Get all documents from the uploads table"""
         def _execute_query():
@@ -382,7 +569,7 @@ class DatabaseService:
             else:
                 return []
         
-        success, result, error = self._handle_db_operation("get_all_documents", _execute_query)
+        success, result, error = await self._run_db_operation("get_all_documents", _execute_query)
         
         if success:
             return result
@@ -390,16 +577,17 @@ class DatabaseService:
             logger.error(f"Error getting documents: {error.message if error else 'Unknown error'}")
             return []
     
-    async def get_document_chunks(self, document_id: int) -> List[Dict[str, Any]]:
-        """Get all chunks for a specific document"""
+    async def get_document_chunks(self, document_id: int, include_embedding: bool = False) -> List[Dict[str, Any]]:
+        """Get all chunks for a specific document, without embeddings unless requested"""
+        columns = "*" if include_embedding else CHUNK_COLUMNS
         def _execute_query():
-            response = self.client.table("document_chunks").select("*").eq("document_id", document_id).order("chunk_index").execute()
+            response = self.client.table("document_chunks").select(columns).eq("document_id", document_id).order("chunk_index").execute()
             if hasattr(response, 'data'):
                 return response.data
             else:
                 return []
         
-        success, result, error = self._handle_db_operation("get_document_chunks", _execute_query)
+        success, result, error = await self._run_db_operation("get_document_chunks", _execute_query)
         
         if success:
             return result
@@ -407,19 +595,21 @@ class DatabaseService:
             logger.error(f"Error getting document chunks: {error.message if error else 'Unknown error'}")
             return []
     
-    async def search_documents(self, query: str) -> List[Dict[str, Any]]:
+    async def search_documents(self, query: str, include_embedding: bool = False) -> List[Dict[str, Any]]:
         """
         Search documents based on content (simple text search)
         In a real implementation, this would use vector similarity search
+        Embeddings are omitted from the results unless include_embedding is set
         """
+        columns = "*" if include_embedding else CHUNK_COLUMNS
         def _execute_query():
-            response = self.client.table("document_chunks").select("*").textSearch("content", query).execute()
+            response = self.client.table("document_chunks").select(columns).textSearch("content", query).execute()
             if hasattr(response, 'data'):
                 return response.data
             else:
                 return []
         
-        success, result, error = self._handle_db_operation("search_documents", _execute_query)
+        success, result, error = await self._run_db_operation("search_documents", _execute_query)
         
         if success:
             return result
@@ -429,21 +619,28 @@ class DatabaseService:
     
     async def delete_document(self, document_id: int) -> bool:
         """Delete a document and all its chunks"""
+        return await self.delete_documents([document_id])
+    
+    async def delete_documents(self, document_ids: List[int]) -> bool:
+        """Delete several documents and all their chunks in one round-trip per table"""
+        if not document_ids:
+            return True
+        
         def _execute_delete():
             # Delete associated chunks first (foreign key constraint)
-            chunks_response = self.client.table("document_chunks").delete().eq("document_id", document_id).execute()
+            chunks_response = self.client.table("document_chunks").delete().in_("document_id", document_ids).execute()
             
-            # Delete the document
-            doc_response = self.client.table("uploads").delete().eq("id", document_id).execute()
+            # Delete the documents
+            doc_response = self.client.table("uploads").delete().in_("id", document_ids).execute()
             return True
         
-        success, result, error = self._handle_db_operation("delete_document", _execute_delete)
+        success, result, error = await self._run_db_operation("delete_documents", _execute_delete)
         
         if success:
-            logger.info(f"Deleted document ID: {document_id} and its chunks")
+            logger.info(f"Deleted document IDs: {document_ids} and their chunks")
             return True
         else:
-            logger.error(f"Error deleting document: {error.message if error else 'Unknown error'}")
+            logger.error(f"Error deleting documents: {error.message if error else 'Unknown error'}")
             return False
 
     async def get_tags(self) -> List[Dict[str, Any]]:
@@ -454,7 +651,7 @@ class DatabaseService:
                 return response.data
             else:
                 return []
-        success, result, error = self._handle_db_operation("get_tags", _execute_query)
+        success, result, error = await self._run_db_operation("get_tags", _execute_query)
         return result if success else []
 
     async def add_tag(self, name: str, color: str = None) -> Optional[int]:
@@ -468,7 +665,7 @@ class DatabaseService:
                 return response.data[0]['id']
             else:
                 return None
-        success, result, error = self._handle_db_operation("add_tag", _execute_insert)
+        success, result, error = await self._run_db_operation("add_tag", _execute_insert)
         return result if success else None
 
     async def delete_tag(self, tag_id: int) -> bool:
@@ -476,7 +673,7 @@ class DatabaseService:
         def _execute_delete():
             response = self.client.table("tags").delete().eq("id", tag_id).execute()
             return True
-        success, result, error = self._handle_db_operation("delete_tag", _execute_delete)
+        success, result, error = await self._run_db_operation("delete_tag", _execute_delete)
         return success
 
     async def get_document_tags(self, document_id: int) -> List[Dict[str, Any]]:
@@ -487,7 +684,7 @@ class DatabaseService:
                 return response.data
             else:
                 return []
-        success, result, error = self._handle_db_operation("get_document_tags", _execute_query)
+        success, result, error = await self._run_db_operation("get_document_tags", _execute_query)
         return result if success else []
 
     async def add_tag_to_document(self, document_id: int, tag_id: int) -> bool:
@@ -495,7 +692,7 @@ class DatabaseService:
         def _execute_insert():
             response = self.client.table("document_tags").insert({"document_id": document_id, "tag_id": tag_id}).execute()
             return True
-        success, result, error = self._handle_db_operation("add_tag_to_document", _execute_insert)
+        success, result, error = await self._run_db_operation("add_tag_to_document", _execute_insert)
         return success
 
     async def remove_tag_from_document(self, document_id: int, tag_id: int) -> bool:
@@ -503,7 +700,7 @@ class DatabaseService:
         def _execute_delete():
             response = self.client.table("document_tags").delete().eq("document_id", document_id).eq("tag_id", tag_id).execute()
             return True
-        success, result, error = self._handle_db_operation("remove_tag_from_document", _execute_delete)
+        success, result, error = await self._run_db_operation("remove_tag_from_document", _execute_delete)
         return success
 
     async def vector_search_documents(self, query: str, top_k: int = 5) -> list:
@@ -512,7 +709,7 @@ class DatabaseService:
         Returns top_k most similar document chunks.
         """
         # Generate embedding for the query
-        query_embedding = generate_embedding(query)
+        query_embedding = await asyncio.to_thread(generate_embedding, query)
         def _execute_query():
             # Supabase vector search: use .select().match() or .vectorSearch() depending on SDK
             # Here we use .match() for demonstration; adjust as needed for your SDK
@@ -524,7 +721,7 @@ class DatabaseService:
                 return response.data
             else:
                 return []
-        success, result, error = self._handle_db_operation("vector_search_documents", _execute_query)
+        success, result, error = await self._run_db_operation("vector_search_documents", _execute_query)
         if success:
             return result
         else:
@@ -1,10 +1,13 @@
 """Service for processing documents into searchable chunks with embeddings."""
 import os
+import re
+import mmap
 import logging
+import zipfile
+import xml.etree.ElementTree as ET
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import PyPDF2
-import docx
 import json
 from services.database_service import database_service, DocumentChunk, generate_embedding
 from utils.logging_utils import setup_json_logging
@@ -12,9 +15,16 @@ from utils.logging_utils import setup_json_logging
 # Configure logging
 logger = setup_json_logging("document_processor")
 
+# WordprocessingML namespace used in word/document.xml
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
 class DocumentProcessorService:
     """Service to process documents into searchable chunks with embeddings (Voyage AI)"""
     
+    # Paragraph and sentence boundaries, compiled once per process
+    _PARA_RE = re.compile(r'\n\s*\n')
+    _SENT_RE = re.compile(r'(?<=[.!?])\s+')
+    
     def __init__(self, chunk_size: int = 1000):
         """
         Initialize document processor
@@ -50,13 +60,13 @@ class DocumentProcessorService:
             chunks = self._create_chunks(text)
             logger.info(f"Created {len(chunks)} chunks for document {document_id}")
             
-            # Store chunks with embeddings (Voyage AI)
+            # Build chunks with embeddings (Voyage AI)
+            chunk_objects = []
             for i, chunk_text in enumerate(chunks):
                 # Generate embedding (Voyage AI)
                 embedding = generate_embedding(chunk_text)
                 
-                # Create chunk object
-                chunk = DocumentChunk(
+                chunk_objects.append(DocumentChunk(
                     document_id=document_id,
                     chunk_index=i,
                     content=chunk_text,
@@ -66,13 +76,13 @@ class DocumentProcessorService:
                         "chunk_number": i,
                         "total_chunks": len(chunks)
                     }
-                )
-                
-                # Store in database
-                success = await database_service.store_document_chunk(chunk)
-                if not success:
-                    logger.error(f"Failed to store chunk {i} for document {document_id}")
-                    return False
+                ))
+            
+            # Store all chunks in one request
+            success = await database_service.store_document_chunks(chunk_objects)
+            if not success:
+                logger.error(f"Failed to store chunks for document {document_id}")
+                return False
                     
             logger.info(f"Successfully processed document {document_id}")
             return True
@@ -86,8 +96,7 @@ class DocumentProcessorService:
         try:
             if file_type in ['text/plain', 'text/markdown', 'application/json']:
                 # Text files
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                return self._read_text_file(file_path)
                     
             elif file_type == 'application/pdf':
                 # PDF files
@@ -100,13 +109,11 @@ class DocumentProcessorService:
                 
             elif file_type in ['application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
                 # Word documents
-                doc = docx.Document(file_path)
-                return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+                return self._extract_docx_text(file_path)
                 
             elif file_type == 'text/csv':
                 # CSV files - read as text
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                return self._read_text_file(file_path)
                     
             else:
                 logger.warning(f"Unsupported file type: {file_type}")
@@ -116,17 +123,48 @@ class DocumentProcessorService:
             logger.error(f"Error extracting text from {file_path}: {str(e)}")
             return None
     
+    def _read_text_file(self, file_path: str) -> str:
+        """
+        Decode a text file straight from a read-only memory map so the page
+        cache backs the bytes instead of an intermediate Python buffer.
+        """
+        with open(file_path, 'rb') as f:
+            # mmap cannot map an empty file
+            if os.fstat(f.fileno()).st_size == 0:
+                return ''
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return str(mm, 'utf-8', 'replace')
+    
+    def _extract_docx_text(self, file_path: str) -> str:
+        """
+        Stream paragraph text out of word/document.xml without building
+        the full python-docx object tree, keeping memory flat on large files.
+        """
+        paragraphs = []
+        with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as f:
+            for _, element in ET.iterparse(f, events=("end",)):
+                if element.tag == WORD_NS + "p":
+                    paragraphs.append("".join(t.text or "" for t in element.iter(WORD_NS + "t")))
+                    element.clear()
+        return '\n'.join(paragraphs)
+    
     def _create_chunks(self, text: str) -> List[str]:
         """
         Split text into chunks of approximately target size for embedding.
         This is only for preparing text for embedding with Voyage AI.
         """
+        chunk_size = self.chunk_size
+        
+        # Text that already fits in one chunk needs no splitting
+        if len(text) <= chunk_size:
+            return [text] if text.strip() else []
+        
         chunks = []
         current_chunk = []
         current_size = 0
         
         # Split into paragraphs first
-        paragraphs = text.split('\n\n')
+        paragraphs = self._PARA_RE.split(text)
         
         for paragraph in paragraphs:
             # Skip empty paragraphs
@@ -134,14 +172,14 @@ class DocumentProcessorService:
                 continue
                 
             # If paragraph is too long, split into sentences
-            if len(paragraph) > self.chunk_size:
-                sentences = paragraph.split('. ')
+            if len(paragraph) > chunk_size:
+                sentences = self._SENT_RE.split(paragraph)
                 for sentence in sentences:
                     if not sentence.strip():
                         continue
                         
                     # If adding this sentence exceeds chunk size, start new chunk
-                    if current_size + len(sentence) > self.chunk_size:
+                    if current_size + len(sentence) > chunk_size:
                         if current_chunk:
                             chunks.append(' '.join(current_chunk))
                             current_chunk = []
@@ -152,7 +190,7 @@ class DocumentProcessorService:
                     
             else:
                 # If adding this paragraph exceeds chunk size, start new chunk
-                if current_size + len(paragraph) > self.chunk_size:
+                if current_size + len(paragraph) > chunk_size:
                     if current_chunk:
                         chunks.append(' '.join(current_chunk))
                         current_chunk = []
@@ -1,13 +1,55 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, BinaryIO, Set
 import os
+import sys
+import asyncio
 import logging
-import aiofiles
+from functools import lru_cache, partial
 from fastapi import UploadFile
 from pydantic import BaseModel
 from services.database_service import database_service, DocumentMetadata
 
 logger = logging.getLogger(__name__)
 
+# MIME types by lowercase file extension
+MIME_TYPES = {
+    'pdf': 'application/pdf',
+    'txt': 'text/plain',
+    'csv': 'text/csv',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'xls': 'application/vnd.ms-excel',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png'
+}
+
+@lru_cache(maxsize=256)
+def _mime_type_for_extension(extension: str) -> str:
+    """Map a raw file extension to its MIME type, case-insensitively"""
+    return MIME_TYPES.get(extension.lower(), 'application/octet-stream')
+
+def get_mime_type(filename: str) -> str:
+    """Get file MIME type based on extension, lowercasing only the suffix"""
+    return _mime_type_for_extension(os.path.splitext(filename)[1][1:])
+
+# Bytes copied per read/write when persisting an upload
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# sendfile between regular files is only supported on Linux
+_CAN_SENDFILE = sys.platform.startswith("linux")
+
+# DB upload paths are stored relative to the project root, resolved once at import
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _list_file_names(directory: str) -> Set[str]:
+    """Return the names of regular files in a directory from a single scandir pass"""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except OSError:
+        return set()
+
 class UploadResponse(BaseModel):
     filename: str
     path: str
@@ -17,7 +59,8 @@ class UploadService:
     def __init__(self, upload_dir: str = None):
         # Use absolute path for uploads directory
         self.upload_dir = upload_dir or os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
-        self.uploaded_documents = []
+        self.project_root = _PROJECT_ROOT
+        self.uploaded_documents: Dict[str, Dict[str, Any]] = {}  # Keyed by filename
         self.unsynced_metadata = []  # Queue for metadata that failed to save
         self._ensure_upload_dir()
         # Initialize with empty list, will be populated when needed
@@ -39,18 +82,18 @@ class UploadService:
             try:
                 db_documents = await database_service.get_all_documents()
                 if db_documents:
-                    self.uploaded_documents = []
+                    self.uploaded_documents = {}
                     for doc in db_documents:
                         # Verify file exists locally
                         if os.path.isfile(doc["upload_path"]):
-                            self.uploaded_documents.append({
+                            self.uploaded_documents[doc["filename"]] = {
                                 "id": doc["id"],
                                 "name": doc["filename"],
                                 "path": doc["upload_path"],
                                 "type": doc.get("file_type"),
                                 "size": doc.get("file_size"),
                                 "uploaded_at": doc.get("uploaded_at")
-                            })
+                            }
                     logger.info(f"Loaded {len(self.uploaded_documents)} documents from database")
                     return
             except Exception as e:
@@ -58,26 +101,30 @@ class UploadService:
         
         # Fallback to loading from filesystem
         logger.info("Loading documents from filesystem (database not available)")
-        for filename in os.listdir(self.upload_dir):
-            file_path = os.path.join(self.upload_dir, filename)
-            if os.path.isfile(file_path):
+        with os.scandir(self.upload_dir) as entries:
+            for entry in entries:
+                # The file type usually comes from the directory read itself (d_type);
+                # entry.stat() below still costs one syscall per file on Linux, then is cached
+                if not entry.is_file():
+                    continue
+                filename = entry.name
                 try:
-                    file_size = os.path.getsize(file_path)
+                    file_size = entry.stat().st_size
                     file_type = self._get_file_type(filename)
                     
                     doc_info = {
                         "name": filename,
-                        "path": file_path,
+                        "path": entry.path,
                         "type": file_type,
                         "size": file_size
                     }
-                    self.uploaded_documents.append(doc_info)
+                    self.uploaded_documents[filename] = doc_info
                     
                     # Try to add to database for future reference
                     if database_service.is_connected:
                         metadata = DocumentMetadata(
                             filename=filename,
-                            upload_path=file_path,
+                            upload_path=entry.path,
                             file_type=file_type,
                             file_size=file_size
                         )
@@ -88,20 +135,31 @@ class UploadService:
 
     def _get_file_type(self, filename: str) -> str:
         """Get file MIME type based on extension"""
-        extension = filename.lower().split('.')[-1] if '.' in filename else ''
-        mime_types = {
-            'pdf': 'application/pdf',
-            'txt': 'text/plain',
-            'csv': 'text/csv',
-            'doc': 'application/msword',
-            'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'xls': 'application/vnd.ms-excel',
-            'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'jpg': 'image/jpeg',
-            'jpeg': 'image/jpeg',
-            'png': 'image/png'
-        }
-        return mime_types.get(extension, 'application/octet-stream')
+        return get_mime_type(filename)
+
+    @staticmethod
+    def _write_upload(file_path: str, source: BinaryIO) -> int:
+        """
+        Copy an upload to file_path in fixed-size chunks without buffering it whole
+        and return the bytes written. The file is created with mode 0o644 directly.
+        """
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        with open(fd, "wb") as f:
+            # A SpooledTemporaryFile that has rolled over to disk can be copied in-kernel
+            if _CAN_SENDFILE and getattr(source, "_rolled", False):
+                in_fd = source.fileno()
+                written, size = 0, os.fstat(in_fd).st_size
+                while written < size:
+                    sent = os.sendfile(fd, in_fd, written, size - written)
+                    if sent == 0:
+                        break
+                    written += sent
+                return written
+
+            written = 0
+            while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                written += f.write(chunk)
+            return written
 
     async def upload_file(self, file: UploadFile, request_id: str) -> UploadResponse:
         """Handle file upload and storage"""
@@ -110,12 +168,10 @@ class UploadService:
             file_path = os.path.join(self.upload_dir, file.filename)
             # Store path for DB as 'backend/uploads/filename' (relative to project root)
             db_path = os.path.join("document-query-app/backend/uploads", file.filename)
-            # Read file asynchronously
-            async with aiofiles.open(file_path, "wb") as f:
-                contents = await file.read()
-                await f.write(contents)
-            os.chmod(file_path, 0o644)
-            file_size = os.path.getsize(file_path)
+            # Rewind in case middleware already consumed the body
+            await file.seek(0)
+            # Write and size the upload in one worker-thread hop
+            file_size = await asyncio.to_thread(self._write_upload, file_path, file.file)
             file_type = self._get_file_type(file.filename)
             metadata = DocumentMetadata(
                 filename=file.filename,
@@ -142,13 +198,8 @@ class UploadService:
                 "type": file_type,
                 "size": file_size
             }
-            self.uploaded_documents.append(doc_info)
+            self.uploaded_documents[file.filename] = doc_info
             logger.info(f"[{request_id}] Successfully uploaded file: {file.filename} (path: {file_path}, id: {document_id})")
-            # Validation: check file existence
-            if not os.path.isfile(file_path):
-                logger.error(f"[{request_id}] Uploaded file does not exist at expected path: {file_path}")
-            else:
-                logger.info(f"[{request_id}] File exists at: {file_path}")
             return UploadResponse(
                 filename=file.filename,
                 path=file_path,
@@ -161,15 +212,21 @@ class UploadService:
     async def get_uploaded_documents(self) -> List[Dict[str, Any]]:
         """Get list of uploaded documents"""
         orphaned_documents = []
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        # os.path.join keeps absolute DB paths as they are
+        resolve_path = partial(os.path.join, self.project_root)
         if database_service.is_connected:
             try:
                 db_documents = await database_service.get_all_documents()
                 uploaded_documents = []
+                # One directory listing per distinct parent instead of a stat per row
+                listings: Dict[str, Set[str]] = {}
                 for doc in db_documents:
                     # Join project root with DB path
-                    file_path = os.path.join(project_root, doc["upload_path"]) if not os.path.isabs(doc["upload_path"]) else doc["upload_path"]
-                    if os.path.isfile(file_path):
+                    file_path = resolve_path(doc["upload_path"])
+                    directory, name = os.path.split(file_path)
+                    if directory not in listings:
+                        listings[directory] = _list_file_names(directory)
+                    if name in listings[directory]:
                         uploaded_documents.append({
                             "id": doc["id"],
                             "name": doc["filename"],
@@ -187,37 +244,39 @@ class UploadService:
                 logger.error(f"Error fetching documents from database: {e}. Falling back to in-memory cache.")
         else:
             logger.warning("Database not connected. Using in-memory cache for uploaded documents.")
-        return self.uploaded_documents
+        return list(self.uploaded_documents.values())
 
     async def cleanup_file(self, filename: str):
         """Remove a file and its entry from uploaded documents and database"""
-        try:
-            file_path = os.path.join(self.upload_dir, filename)
-            
-            # Find the document ID
-            document_id = None
-            for doc in self.uploaded_documents:
-                if doc["name"] == filename:
-                    document_id = doc.get("id")
-                    break
-            
-            # Delete from database if ID exists
-            if document_id and database_service.is_connected:
-                await database_service.delete_document(document_id)
-            
-            # Delete file
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            
-            # Remove from local list
-            self.uploaded_documents = [
-                doc for doc in self.uploaded_documents 
-                if doc["name"] != filename
-            ]
-            
-            logger.info(f"Cleaned up file: {filename}")
-        except Exception as e:
-            logger.error(f"Error cleaning up file {filename}: {str(e)}")
+        await self.cleanup_files([filename])
+
+    async def cleanup_files(self, filenames: List[str]):
+        """Remove several files and their entries, deleting their database rows in one batch"""
+        # Collect the document IDs so the database delete is a single request
+        document_ids = [
+            doc["id"] for doc in (self.uploaded_documents.get(name) for name in filenames)
+            if doc and doc.get("id")
+        ]
+        if document_ids and database_service.is_connected:
+            try:
+                await database_service.delete_documents(document_ids)
+            except Exception as e:
+                logger.error(f"Error deleting documents {document_ids} from database: {str(e)}")
+
+        for filename in filenames:
+            try:
+                file_path = os.path.join(self.upload_dir, filename)
+
+                # Delete file
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+                # Remove from local index
+                self.uploaded_documents.pop(filename, None)
+
+                logger.info(f"Cleaned up file: {filename}")
+            except Exception as e:
+                logger.error(f"Error cleaning up file {filename}: {str(e)}")
 
     async def sync_unsynced_metadata(self):
         """Attempt to sync any unsaved file metadata to the database."""
@@ -229,16 +288,16 @@ class UploadService:
             return
         logger.info(f"Attempting to sync {len(self.unsynced_metadata)} unsynced metadata entries.")
         still_unsynced = []
-        for metadata in self.unsynced_metadata:
-            try:
-                document_id = await database_service.store_document(metadata)
-                if document_id > 0:
-                    logger.info(f"Successfully synced metadata for file: {metadata.filename}")
-                else:
-                    logger.error(f"Failed to sync metadata for file: {metadata.filename}")
-                    still_unsynced.append(metadata)
-            except Exception as e:
-                logger.error(f"Error syncing metadata for file {metadata.filename}: {str(e)}")
+        try:
+            document_ids = await database_service.bulk_store_documents(self.unsynced_metadata)
+        except Exception as e:
+            logger.error(f"Error syncing unsynced metadata: {str(e)}")
+            return
+        for metadata, document_id in zip(self.unsynced_metadata, document_ids):
+            if document_id > 0:
+                logger.info(f"Successfully synced metadata for file: {metadata.filename}")
+            else:
+                logger.error(f"Failed to sync metadata for file: {metadata.filename}")
                 still_unsynced.append(metadata)
         self.unsynced_metadata = still_unsynced
 
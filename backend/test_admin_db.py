@@ -1,10 +1,6 @@
 from utils.admin_db_utils import get_admin_client, setup_database, insert_test_data
 import json
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from the specific path
-load_dotenv('/Users/sreeramyashasviv/projects/MISC./AGENTIC-PLAYGROUND/.env')
 
 def test_admin_connection():
     """
@@ -1,46 +1,47 @@
 import os
-import json
-from dotenv import load_dotenv
+import orjson
 from supabase import create_client, Client
 import pytest
 
-# Load environment variables from the absolute path
-load_dotenv('/Users/sreeramyashasviv/projects/MISC./AGENTIC-PLAYGROUND/.env')
+# Environment read once at import so every test sees the same values
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+
+# Pretty-print response payloads only when VERBOSE_TESTS=1
+VERBOSE_TESTS = os.environ.get("VERBOSE_TESTS") == "1"
 
 def test_env_vars():
     """Test if the environment variables are set correctly"""
     print("=== Environment Variables Test ===")
     
     # Check SUPABASE_URL
-    supabase_url = os.getenv("SUPABASE_URL")
-    if supabase_url:
-        print(f"✅ SUPABASE_URL is set: {supabase_url}")
+    if SUPABASE_URL:
+        print(f"✅ SUPABASE_URL is set: {SUPABASE_URL}")
     else:
         print("❌ SUPABASE_URL is not set")
     
     # Check SUPABASE_KEY
-    supabase_key = os.getenv("SUPABASE_KEY")
-    if supabase_key:
-        print(f"✅ SUPABASE_KEY is set: {supabase_key[:10]}...")
+    if SUPABASE_KEY:
+        print(f"✅ SUPABASE_KEY is set: {SUPABASE_KEY[:10]}...")
     else:
         print("❌ SUPABASE_KEY is not set")
     
     # Check SUPABASE_SERVICE_KEY
-    supabase_service_key = os.getenv("SUPABASE_SERVICE_KEY")
-    if supabase_service_key:
-        print(f"✅ SUPABASE_SERVICE_KEY is set: {supabase_service_key[:10]}...")
+    if SUPABASE_SERVICE_KEY:
+        print(f"✅ SUPABASE_SERVICE_KEY is set: {SUPABASE_SERVICE_KEY[:10]}...")
     else:
         print("❌ SUPABASE_SERVICE_KEY is not set")
     
     # Check which key to use
-    key_to_use = supabase_key or supabase_service_key
+    key_to_use = SUPABASE_KEY or SUPABASE_SERVICE_KEY
     if key_to_use:
         print(f"✅ Using key: {key_to_use[:10]}...")
     else:
         print("❌ No Supabase key available")
     
     return {
-        "url": supabase_url,
+        "url": SUPABASE_URL,
         "key": key_to_use
     }
 
@@ -67,7 +68,9 @@ def test_supabase_connection():
     # Try to query the uploads table
     response = supabase.table("uploads").select("*").limit(1).execute()
     assert hasattr(response, 'data'), "No data attribute on response"
-    print(f"✅ Query successful: {json.dumps(response.data, indent=2)}")
+    print(f"✅ Query successful: {len(response.data)} row(s)")
+    if VERBOSE_TESTS:
+        print(orjson.dumps(response.data, option=orjson.OPT_INDENT_2).decode())
 
 if __name__ == "__main__":
     # Test environment variables
@@ -0,0 +1,46 @@
+import orjson
+import numpy as np
+
+from tests.test_config import TEST_ENV
+# Imported as a module so pytest does not try to collect the Test* helper classes
+from tests import test_logging as result_logging
+
+def test_numpy_metric_values_are_saved(tmp_path, monkeypatch):
+    """Metrics recorded as numpy scalars are written to the results and report files"""
+    monkeypatch.setitem(TEST_ENV, "LOG_DIR", str(tmp_path))
+    logger = result_logging.TestLogger("numpy_metrics")
+    logger.log_performance_metric("latency", np.float64(1.5), "s")
+    logger.log_performance_metric("rows", np.int64(3), "rows")
+    logger.finalize()
+
+    results_file, = tmp_path.glob("numpy_metrics_*_results.json")
+    metrics = orjson.loads(results_file.read_bytes())["performance_metrics"]
+    assert metrics["latency"][0]["value"] == 1.5
+    assert metrics["rows"][0]["value"] == 3
+
+    reporter = result_logging.TestReporter(str(tmp_path))
+    report_file = reporter.save_report(reporter.generate_report())
+    assert orjson.loads(open(report_file, "rb").read())["total_tests"] == 1
+
+def test_finalize_writes_and_closes_log_file(tmp_path, monkeypatch):
+    """finalize() flushes the buffered records and closes the run's log file"""
+    monkeypatch.setitem(TEST_ENV, "LOG_DIR", str(tmp_path))
+    logger = result_logging.TestLogger("closed_log")
+    logger.log_step("load", "ok")
+    logger.finalize()
+
+    assert logger._file_handler.stream is None
+    assert "Step: load - Status: ok" in open(logger.log_file).read()
+
+def test_logged_details_are_not_affected_by_later_changes(tmp_path, monkeypatch):
+    """Details buffered for the log file keep the values they had when logged"""
+    monkeypatch.setitem(TEST_ENV, "LOG_DIR", str(tmp_path))
+    logger = result_logging.TestLogger("details_snapshot")
+    details = {"rows": 1}
+    logger.log_step("load", "ok", details)
+    details["rows"] = 2
+    logger.finalize()
+
+    log_text = open(logger.log_file).read()
+    assert '"rows": 1' in log_text
+    assert '"rows": 2' not in log_text
@@ -0,0 +1,39 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.safe_pandas import SafeDataFrame
+
+def test_correlation_matches_series_corr_on_nullable_columns():
+    """Nullable Int64/Float64 columns holding pd.NA correlate like Series.corr"""
+    df = pd.DataFrame({
+        "a": pd.array([1, 2, None, 4, 5], dtype="Int64"),
+        "b": pd.array([2.0, 3.0, 4.0, None, 1.0], dtype="Float64"),
+        "c": [1.0, 2.0, 3.0, 4.0, 6.0],
+    })
+    safe_df = SafeDataFrame(df)
+
+    assert math.isclose(safe_df.correlation("a", "b"), df["a"].corr(df["b"]))
+    assert math.isclose(safe_df.correlation("a", "c"), df["a"].corr(df["c"]))
+
+def test_correlation_with_infinite_value_is_nan():
+    """An infinite value makes the correlation NaN, as it does for Series.corr"""
+    df = pd.DataFrame({"a": [1.0, 2.0, np.inf, 4.0], "b": [2.0, 3.0, 4.0, 6.0]})
+
+    assert math.isnan(SafeDataFrame(df).correlation("a", "b"))
+
+def test_filter_by_value_matches_pandas_comparison():
+    """Filtering returns the rows pandas' == selects, including for None and NaN"""
+    df = pd.DataFrame({
+        "label": pd.Series(["a", None, "b", np.nan], dtype=object),
+        "amount": [1.0, np.nan, 2.0, 1.0],
+        "group": pd.Categorical(["x", "y", None, "x"]),
+    })
+    safe_df = SafeDataFrame(df)
+
+    for column, value in [("label", None), ("label", np.nan), ("label", "a"),
+                          ("amount", np.nan), ("amount", 1.0),
+                          ("group", None), ("group", "x")]:
+        filtered = safe_df.filter_by_value(column, value)._df
+        assert list(filtered.index) == list(df[df[column] == value].index), (column, value)
@@ -0,0 +1,42 @@
+import time
+import threading
+
+from utils.sandbox_utils import ResourceMonitor
+
+# Fast ticks so each test only needs to wait a few monitor intervals
+TEST_MONITOR_INTERVAL = 0.01
+SETTLE_SECONDS = 0.2
+ALLOCATION_BYTES = 64 << 20  # 64 MiB
+
+def test_existing_memory_does_not_count_against_call():
+    """Memory held before a call registers is not attributed to that call"""
+    held = b"\x01" * ALLOCATION_BYTES
+    monitor = ResourceMonitor(interval=TEST_MONITOR_INTERVAL)
+    thread_id = threading.get_ident()
+
+    assert monitor.register(thread_id, max_memory_mb=16)
+    time.sleep(SETTLE_SECONDS)
+
+    assert monitor.unregister(thread_id) is None
+    del held
+
+def test_memory_growth_during_call_is_reported():
+    """Growing RSS past the allowance during a call records a violation"""
+    monitor = ResourceMonitor(interval=TEST_MONITOR_INTERVAL)
+    thread_id = threading.get_ident()
+
+    assert monitor.register(thread_id, max_memory_mb=16)
+    grown = b"\x01" * ALLOCATION_BYTES
+    time.sleep(SETTLE_SECONDS)
+
+    assert monitor.unregister(thread_id) == "Memory usage exceeded limit"
+    del grown
+
+def test_nested_registration_is_rejected():
+    """A thread that is already monitored is not registered a second time"""
+    monitor = ResourceMonitor(interval=TEST_MONITOR_INTERVAL)
+    thread_id = threading.get_ident()
+
+    assert monitor.register(thread_id)
+    assert not monitor.register(thread_id)
+    assert monitor.unregister(thread_id) is None
@@ -0,0 +1,30 @@
+import numpy as np
+from datetime import datetime
+
+from utils.validation_utils import validate_datetime, validate_statistics_dict
+
+def test_statistics_dict_rejects_numpy_temporal_leaves():
+    """datetime64/timedelta64 leaves default to 0.0 instead of becoming epoch counts"""
+    stats = {
+        "first_seen": np.datetime64("2020-01-01"),
+        "spread": {"duration": np.timedelta64(5, "s"), "mean": np.float64(2.5)},
+        "count": 3,
+    }
+
+    assert validate_statistics_dict(stats) == {
+        "first_seen": 0.0,
+        "spread": {"duration": 0.0, "mean": 2.5},
+        "count": 3.0,
+    }
+
+def test_statistics_dict_replaces_invalid_numbers():
+    """NaN, infinities and None default to 0.0 on the vectorized path"""
+    stats = {"a": float("nan"), "b": float("inf"), "c": None, "d": {"e": 1}}
+
+    assert validate_statistics_dict(stats) == {"a": 0.0, "b": 0.0, "c": 0.0, "d": {"e": 1.0}}
+
+def test_datetime64_outside_datetime_range_is_invalid():
+    """datetime64 values beyond datetime's year range return None rather than an int"""
+    assert validate_datetime(np.datetime64("20000-01-01")) is None
+    assert validate_datetime(np.datetime64("NaT")) is None
+    assert validate_datetime(np.datetime64("2020-01-02T03:04:05")) == datetime(2020, 1, 2, 3, 4, 5)
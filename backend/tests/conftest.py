@@ -32,12 +32,12 @@ def test_reporter() -> TestReporter:
     """Create a test reporter instance."""
     return TestReporter()
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_csv(data_generator) -> str:
     """Generate a sample CSV file for testing."""
     return data_generator.generate_csv_file(size="small")
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def large_csv(data_generator) -> str:
     """Generate a large CSV file for testing."""
     return data_generator.generate_csv_file(size="large")
@@ -47,35 +47,32 @@ def csv_with_errors(data_generator) -> str:
     """Generate a CSV file with intentional errors."""
     return data_generator.generate_csv_file(size="small", with_errors=True)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def malicious_csv(data_generator) -> str:
     """Generate a malicious CSV file for security testing."""
     return data_generator.generate_malicious_file("csv")
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def csv_chunks(data_generator) -> list[str]:
     """Generate multiple CSV chunks for testing chunked processing."""
     return data_generator.generate_large_file_chunks()
 
 def pytest_configure(config):
-    """Configure pytest with custom markers."""
+    """Configure pytest with custom markers and the test environment."""
     config.addinivalue_line("markers", "performance: mark test as a performance test")
     config.addinivalue_line("markers", "integration: mark test as an integration test")
     config.addinivalue_line("markers", "security: mark test as a security test")
+    
+    # Set up any necessary environment variables once for the whole session
+    os.environ["TESTING"] = "true"
 
 def pytest_runtest_setup(item):
     """Set up test environment before each test."""
-    # Set up any necessary environment variables or configurations
-    os.environ["TESTING"] = "true"
-    
     # Log test start
-    logger = TestLogger(item.name)
-    item.user_properties.append(("logger", logger))
+    item._logger = TestLogger(item.name)
 
 def pytest_runtest_teardown(item, nextitem):
     """Clean up after each test."""
-    # Get the logger from user properties
-    for name, logger in item.user_properties:
-        if name == "logger":
-            logger.finalize()
-            break 
\ No newline at end of file
+    logger = getattr(item, "_logger", None)
+    if logger is not None:
+        logger.finalize()
@@ -1,10 +1,20 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import time
 import uuid
 from datetime import datetime
 
 import colorlog
 
+def _stop_queue_listener(logger: logging.Logger):
+    """Drain the logger's current queue listener and close its file handler."""
+    logger.queue_listener.stop()
+    for handler in logger.queue_listener.handlers:
+        handler.close()
+
 def setup_logging(test_name: str) -> logging.Logger:
     """Set up logging configuration for agent tests with color-coding and run ID."""
     # Create logs directory if it doesn't exist
@@ -22,34 +32,54 @@ def setup_logging(test_name: str) -> logging.Logger:
     logger = logging.getLogger(f'agent_test.{test_name}')
     logger.setLevel(logging.DEBUG)
 
-    # Track start time for delta calculations
-    logger.start_time = datetime.now()
-    logger.last_time = logger.start_time
+    # Track start time for delta calculations on the monotonic clock, in nanoseconds
+    logger.start_ns = time.perf_counter_ns()
+    logger.last_ns = logger.start_ns
 
     def add_delta(record):
-        current_time = datetime.now()
-        delta = (current_time - logger.last_time).total_seconds() * 1000  # in milliseconds
-        logger.last_time = current_time
-        record.delta_ms = f'{delta:.2f}ms'
+        # Stamped once per record even though both handlers run this filter
+        if hasattr(record, 'delta_ms'):
+            return True
+        # Numbers only; the formatters render them if a handler actually emits the record
+        current_ns = time.perf_counter_ns()
+        record.delta_ms = (current_ns - logger.last_ns) / 1e6
+        record.total_time_ms = (current_ns - logger.start_ns) / 1e6
         record.run_id = run_id
-        record.total_time_ms = f'{(current_time - logger.start_time).total_seconds() * 1000:.2f}ms'
+        logger.last_ns = current_ns
         return True
 
     # File handler
     file_handler = logging.FileHandler(log_file)
     file_handler.setLevel(logging.DEBUG)
     file_formatter = logging.Formatter(
-        '%(asctime)s - %(run_id)s - %(delta_ms)s - %(total_time_ms)s - %(name)s - %(levelname)s - %(message)s'
+        '%(asctime)s - %(run_id)s - %(delta_ms).2fms - %(total_time_ms).2fms - %(name)s - %(levelname)s - %(message)s'
     )
-    file_handler.addFilter(add_delta)
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
 
-    # Console handler with colors
-    console_handler = logging.StreamHandler()
+    # Records are queued on the test thread and written to disk by a background listener;
+    # a listener left from an earlier call for this logger is stopped and replaced
+    previous_listener = getattr(logger, 'queue_listener', None)
+    if previous_listener is not None:
+        logger.removeHandler(logger.queue_handler)
+        _stop_queue_listener(logger)
+    log_queue = queue.SimpleQueue()
+    logger.queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Handler filters, unlike logger filters, also see records propagated from child loggers
+    logger.queue_handler.addFilter(add_delta)
+    logger.addHandler(logger.queue_handler)
+    logger.queue_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    logger.queue_listener.start()
+    if previous_listener is None:
+        # Registered once per logger; it stops whichever listener is current at exit
+        atexit.register(_stop_queue_listener, logger)
+
+    # Console handler with colors, replacing one left from an earlier call
+    if getattr(logger, 'console_handler', None) is not None:
+        logger.removeHandler(logger.console_handler)
+    console_handler = logger.console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_formatter = colorlog.ColoredFormatter(
-        '%(log_color)s%(levelname)s%(reset)s - %(run_id)s - %(delta_ms)s - %(message)s',
+        '%(log_color)s%(levelname)s%(reset)s - %(run_id)s - %(delta_ms).2fms - %(message)s',
         log_colors={
             'DEBUG': 'cyan',
             'INFO': 'green',
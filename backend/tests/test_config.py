@@ -1,5 +1,6 @@
 """Test configuration and environment settings."""
 import os
+import shutil
 import tempfile
 from pathlib import Path
 from typing import Dict, Any
@@ -14,6 +15,9 @@ TEST_ENV = {
     "LOG_DIR": os.path.join(tempfile.gettempdir(), "test_logs"),
 }
 
+# Buffer size for test file writers, well above Python's 8 KiB default
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB
+
 # Test data configurations
 TEST_DATA_CONFIG = {
     "CSV_SIZES": {
@@ -75,12 +79,7 @@ def setup_test_environment() -> Dict[str, Any]:
 
 def cleanup_test_environment():
     """Clean up test environment after tests."""
-    # Clean up test upload directory
-    if os.path.exists(TEST_ENV["UPLOAD_DIR"]):
-        for file in os.listdir(TEST_ENV["UPLOAD_DIR"]):
-            os.remove(os.path.join(TEST_ENV["UPLOAD_DIR"], file))
-    
-    # Clean up test logs
-    if os.path.exists(TEST_ENV["LOG_DIR"]):
-        for file in os.listdir(TEST_ENV["LOG_DIR"]):
-            os.remove(os.path.join(TEST_ENV["LOG_DIR"], file)) 
\ No newline at end of file
+    # Empty the test upload and log directories by removing and recreating them
+    for dir_path in [TEST_ENV["UPLOAD_DIR"], TEST_ENV["LOG_DIR"]]:
+        shutil.rmtree(dir_path, ignore_errors=True)
+        Path(dir_path).mkdir(parents=True, exist_ok=True)
@@ -1,12 +1,46 @@
 """Test data generation utilities."""
 import os
+import shutil
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from typing import List, Dict, Any
-import random
 import string
-from datetime import datetime, timedelta
-from .test_config import TEST_ENV, TEST_DATA_CONFIG
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from .test_config import TEST_ENV, TEST_DATA_CONFIG, WRITE_BUFFER_SIZE
+
+def _to_csv_table(df: pd.DataFrame) -> pa.Table:
+    """Convert a DataFrame to an Arrow table ready for the CSV writer."""
+    # Mixed-type columns (from injected errors) are written as their string form
+    mixed = {col: str for col in df.columns if df[col].dtype == object}
+    return pa.Table.from_pandas(df.astype(mixed) if mixed else df, preserve_index=False)
+
+def _write_csv(df: pd.DataFrame, filepath: str):
+    """Write a DataFrame as CSV through Arrow's columnar C++ writer."""
+    pa_csv.write_csv(_to_csv_table(df), filepath)
+
+def _write_csv_buffer(df: pd.DataFrame, filepath: str):
+    """Serialize a DataFrame to an in-memory CSV buffer and write it with a single syscall."""
+    sink = pa.BufferOutputStream()
+    pa_csv.write_csv(_to_csv_table(df), sink)
+    buffer = sink.getvalue()
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(buffer)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+# Bytes written per call when streaming oversized test files
+MALICIOUS_WRITE_BLOCK = 1 << 20  # 1 MiB
+# Characters used for random text paragraphs, as a byte array for numpy sampling
+TEXT_ALPHABET = np.frombuffer((string.ascii_letters + ' ').encode('ascii'), dtype=np.uint8)
+TEXT_PARAGRAPH_LENGTH = 100
+# Generator-API RNG for text sampling; faster than the legacy np.random functions
+_TEXT_RNG = np.random.default_rng()
 
 class TestDataGenerator:
     """Generates test data for various test scenarios."""
@@ -14,51 +48,62 @@ class TestDataGenerator:
     def __init__(self):
         self.data_dir = TEST_ENV["TEST_DATA_DIR"]
         os.makedirs(self.data_dir, exist_ok=True)
+        # Generated clean CSV paths keyed by size, reused while the file exists
+        self._csv_cache: Dict[str, str] = {}
     
     def generate_csv_file(self, size: str = "small", with_errors: bool = False) -> str:
-        """Generate a CSV file with specified size and optional errors."""
+        """Generate a CSV file with specified size and optional errors.
+
+        Clean files are reused across calls. Files with errors are rewritten on
+        every call, because tests that use them may modify or delete them.
+        """
+        cached = None if with_errors else self._csv_cache.get(size)
+        if cached and os.path.exists(cached):
+            return cached
+        
         num_rows = TEST_DATA_CONFIG["CSV_SIZES"][size]
         
-        # Generate sample data
+        # Generate sample data as whole columns, newest date first
+        now = datetime.now()
         data = {
-            'date': [datetime.now() - timedelta(days=x) for x in range(num_rows)],
+            'date': pd.date_range(end=now, periods=num_rows, freq='D')[::-1],
             'value': np.random.normal(100, 15, num_rows),
             'category': np.random.choice(['A', 'B', 'C'], num_rows),
             'quantity': np.random.randint(1, 1000, num_rows)
         }
         
+        df = pd.DataFrame(data)
+        
         if with_errors:
-            # Introduce some errors
+            # Introduce some errors: a tenth of the rows, split between the two numeric columns
             error_indices = np.random.choice(num_rows, size=num_rows//10, replace=False)
-            for idx in error_indices:
-                if random.random() < 0.5:
-                    data['value'][idx] = 'invalid'
-                else:
-                    data['quantity'][idx] = 'N/A'
-        
-        df = pd.DataFrame(data)
+            in_value = np.random.random(len(error_indices)) < 0.5
+            df = df.astype({'value': object, 'quantity': object})
+            df.loc[error_indices[in_value], 'value'] = 'invalid'
+            df.loc[error_indices[~in_value], 'quantity'] = 'N/A'
         
         # Save to file
         filename = f"test_data_{size}{'_with_errors' if with_errors else ''}.csv"
         filepath = os.path.join(self.data_dir, filename)
-        df.to_csv(filepath, index=False)
+        _write_csv(df, filepath)
         
+        if not with_errors:
+            self._csv_cache[size] = filepath
         return filepath
     
     def generate_text_file(self, size: str = "small") -> str:
         """Generate a text file with random content."""
         num_paragraphs = TEST_DATA_CONFIG["CSV_SIZES"][size] // 10
         
-        content = []
-        for _ in range(num_paragraphs):
-            words = ''.join(random.choices(string.ascii_letters + ' ', k=100))
-            content.append(words)
-        
         filename = f"test_data_{size}.txt"
         filepath = os.path.join(self.data_dir, filename)
         
-        with open(filepath, 'w') as f:
-            f.write('\n\n'.join(content))
+        # Paragraphs are streamed one at a time so the whole file is never held in memory
+        with open(filepath, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            for i in range(num_paragraphs):
+                if i:
+                    f.write(b'\n\n')
+                f.write(_TEXT_RNG.choice(TEXT_ALPHABET, size=TEXT_PARAGRAPH_LENGTH).tobytes())
         
         return filepath
     
@@ -67,16 +112,24 @@ class TestDataGenerator:
         filename = f"malicious_test.{file_type}"
         filepath = os.path.join(self.data_dir, filename)
         
+        if file_type == 'txt':
+            # Text with large repetitive content, streamed so it is never held in memory
+            block = b'A' * MALICIOUS_WRITE_BLOCK
+            remaining = TEST_ENV["MAX_FILE_SIZE"] + 1
+            with open(filepath, 'wb') as f:
+                while remaining:
+                    n = min(len(block), remaining)
+                    f.write(block[:n])
+                    remaining -= n
+            return filepath
+        
         if file_type == 'csv':
             # CSV with formula injection
             content = 'id,name,formula\n1,test,=CMD(\'del *.*\')'
-        elif file_type == 'txt':
-            # Text with large repetitive content
-            content = 'A' * (TEST_ENV["MAX_FILE_SIZE"] + 1)
         else:
             content = 'Unsupported file type'
         
-        with open(filepath, 'w') as f:
+        with open(filepath, 'w', buffering=WRITE_BUFFER_SIZE) as f:
             f.write(content)
         
         return filepath
@@ -84,23 +137,29 @@ class TestDataGenerator:
     def generate_large_file_chunks(self, chunk_size: int = 1000) -> List[str]:
         """Generate multiple file chunks for testing chunked processing."""
         num_chunks = 5
-        chunk_files = []
-        
-        for i in range(num_chunks):
-            data = {
-                'id': range(i * chunk_size, (i + 1) * chunk_size),
-                'value': np.random.normal(100, 15, chunk_size),
-                'timestamp': [datetime.now() + timedelta(minutes=x) 
-                            for x in range(i * chunk_size, (i + 1) * chunk_size)]
-            }
-            df = pd.DataFrame(data)
+        total_rows = num_chunks * chunk_size
+        
+        # Draw every chunk's data in one allocation and hand out per-chunk slices
+        ids = np.arange(total_rows)
+        values = np.random.normal(100, 15, total_rows).reshape(num_chunks, chunk_size)
+        timestamps = pd.date_range(start=datetime.now(), periods=total_rows, freq='min')
+        
+        def write_chunk(i: int) -> str:
+            rows = slice(i * chunk_size, (i + 1) * chunk_size)
+            df = pd.DataFrame({
+                'id': ids[rows],
+                'value': values[i],
+                'timestamp': timestamps[rows]
+            })
             
             filename = f"chunk_{i}.csv"
             filepath = os.path.join(self.data_dir, filename)
-            df.to_csv(filepath, index=False)
-            chunk_files.append(filepath)
+            _write_csv_buffer(df, filepath)
+            return filepath
         
-        return chunk_files
+        # Serialization and the os.write calls release the GIL, so chunks are written in parallel
+        with ThreadPoolExecutor(max_workers=num_chunks) as executor:
+            return list(executor.map(write_chunk, range(num_chunks)))
     
     def generate_test_upload_file(self, file_type: str, size: str = "small") -> Dict[str, Any]:
         """Generate a file suitable for upload testing."""
@@ -119,6 +178,6 @@ class TestDataGenerator:
     
     def cleanup_test_data(self):
         """Clean up generated test data."""
-        if os.path.exists(self.data_dir):
-            for file in os.listdir(self.data_dir):
-                os.remove(os.path.join(self.data_dir, file)) 
\ No newline at end of file
+        self._csv_cache.clear()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+        os.makedirs(self.data_dir, exist_ok=True)
\ No newline at end of file
@@ -1,12 +1,45 @@
 """Test logging and reporting utilities."""
+import copy
 import os
 import json
+import time
 import logging
+import logging.handlers
+import orjson
+import numpy as np
+from collections import defaultdict
 from datetime import datetime
 from typing import Dict, Any, Optional
 from pathlib import Path
 from .test_config import TEST_ENV
 
+# Records buffered in memory before they are written to the log file
+LOG_BUFFER_CAPACITY = 256
+# Result and report files are compact unless VERBOSE_TESTS=1 asks for indented output;
+# metric values may be numpy scalars, which json.dump accepted as floats
+RESULT_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | (
+    orjson.OPT_INDENT_2 if os.getenv("VERBOSE_TESTS") == "1" else 0
+)
+
+# Shared log line format for the file and console handlers
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class _LazyJSON:
+    """Defers pretty-printing a value until a log handler actually formats the record."""
+    
+    __slots__ = ("value", "compact")
+    
+    def __init__(self, value: Any, compact: bool = False):
+        # Shallow snapshot: buffered records may be formatted well after the caller
+        # has gone on to change the dict it logged
+        self.value = copy.copy(value)
+        self.compact = compact
+    
+    def __str__(self) -> str:
+        if self.compact:
+            return json.dumps(self.value, separators=(',', ':'))
+        return json.dumps(self.value, indent=2)
+
 class TestLogger:
     """Handles logging for test execution and results."""
     
@@ -22,6 +55,9 @@ class TestLogger:
             "performance_metrics": {},
             "errors": []
         }
+        # Whole-second ISO prefix reused by every entry logged within that second
+        self._last_ts_sec = None
+        self._last_ts_str = ""
         
         # Set up logging
         self._setup_logging()
@@ -34,40 +70,59 @@ class TestLogger:
         timestamp = self.start_time.strftime("%Y%m%d_%H%M%S")
         self.log_file = os.path.join(self.log_dir, f"{self.test_name}_{timestamp}.log")
         
-        # Configure logging
+        # File records are buffered and written in batches, or at once on an error
+        self._file_handler = logging.FileHandler(self.log_file)
+        self._file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        self._memory_handler = logging.handlers.MemoryHandler(
+            capacity=LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=self._file_handler
+        )
+        
+        # Configure console logging
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_file),
-                logging.StreamHandler()
-            ]
+            format=LOG_FORMAT,
+            handlers=[logging.StreamHandler()]
         )
         
+        # basicConfig is a no-op once the root logger has handlers, so the
+        # per-run file buffer is attached to this test's own logger instead
         self.logger = logging.getLogger(self.test_name)
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(self._memory_handler)
+    
+    def _timestamp(self) -> str:
+        """Return the current local time as an ISO string, caching the per-second part."""
+        now = time.time()
+        sec = int(now)
+        if sec != self._last_ts_sec:
+            self._last_ts_str = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(sec))
+            self._last_ts_sec = sec
+        return f"{self._last_ts_str}.{int((now - sec) * 1e6):06d}"
     
     def log_step(self, step_name: str, status: str, details: Optional[Dict[str, Any]] = None):
         """Log a test step with its status and details."""
         step_data = {
             "name": step_name,
             "status": status,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._timestamp(),
             "details": details or {}
         }
         
         self.test_results["steps"].append(step_data)
         
         # Log to file
-        self.logger.info(f"Step: {step_name} - Status: {status}")
+        self.logger.info("Step: %s - Status: %s", step_name, status)
         if details:
-            self.logger.info(f"Details: {json.dumps(details, indent=2)}")
+            self.logger.info("Details: %s", _LazyJSON(details))
     
     def log_performance_metric(self, metric_name: str, value: float, unit: str):
         """Log a performance metric."""
         metric_data = {
             "value": value,
             "unit": unit,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._timestamp()
         }
         
         if metric_name not in self.test_results["performance_metrics"]:
@@ -82,14 +137,15 @@ class TestLogger:
         error_data = {
             "message": error_message,
             "type": error_type,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._timestamp(),
             "details": details or {}
         }
         
         self.test_results["errors"].append(error_data)
-        self.logger.error(f"Error ({error_type}): {error_message}")
+        self.logger.error("Error (%s): %s", error_type, error_message)
         if details:
-            self.logger.error(f"Error details: {json.dumps(details, indent=2)}")
+            # Details are already kept structured in test_results; the log line stays one line
+            self.logger.error("Error details: %s", _LazyJSON(details, compact=True))
     
     def finalize(self, status: str = "completed"):
         """Finalize the test results and save to file."""
@@ -106,11 +162,17 @@ class TestLogger:
             f"{self.test_name}_{self.start_time.strftime('%Y%m%d_%H%M%S')}_results.json"
         )
         
-        with open(results_file, 'w') as f:
-            json.dump(self.test_results, f, indent=2)
+        with open(results_file, 'wb') as f:
+            f.write(orjson.dumps(self.test_results, option=RESULT_JSON_OPTIONS))
         
         self.logger.info(f"Test completed with status: {status}")
         self.logger.info(f"Results saved to: {results_file}")
+        # Write out the buffer, then release the log file; closing the
+        # MemoryHandler flushes it but leaves its target open
+        self.logger.removeHandler(self._memory_handler)
+        self._memory_handler.close()
+        self._file_handler.flush()
+        self._file_handler.close()
     
     def get_results(self) -> Dict[str, Any]:
         """Get the current test results."""
@@ -122,35 +184,36 @@ class TestReporter:
     def __init__(self, log_dir: Optional[str] = None):
         self.log_dir = log_dir or TEST_ENV["LOG_DIR"]
     
-    def generate_report(self, test_pattern: Optional[str] = None) -> Dict[str, Any]:
-        """Generate a report from test results matching the pattern."""
-        all_results = []
-        
-        # Collect all result files
-        for file in Path(self.log_dir).glob("*_results.json"):
-            if test_pattern and test_pattern not in file.name:
-                continue
-                
-            with open(file, 'r') as f:
-                results = json.load(f)
-                all_results.append(results)
-        
-        # Aggregate results
+    def generate_report(self, test_pattern: Optional[str] = None, include_results: bool = False) -> Dict[str, Any]:
+        """
+        Generate a report from test results matching the pattern.
+        Result files are aggregated one at a time in a single pass; the raw results are
+        only kept in the report when include_results is set.
+        """
         report = {
-            "total_tests": len(all_results),
+            "total_tests": 0,
             "status_summary": {
                 "completed": 0,
                 "failed": 0,
                 "running": 0
             },
             "error_summary": [],
-            "performance_summary": {},
-            "test_results": all_results
+            "performance_summary": {}
         }
+        all_results = [] if include_results else None
+        metric_values = defaultdict(list)
         
-        # Calculate summaries
-        for result in all_results:
+        for file in Path(self.log_dir).glob("*_results.json"):
+            if test_pattern and test_pattern not in file.name:
+                continue
+                
+            with open(file, 'r') as f:
+                result = json.load(f)
+            
+            report["total_tests"] += 1
             report["status_summary"][result["status"]] += 1
+            if all_results is not None:
+                all_results.append(result)
             
             # Collect errors
             for error in result.get("errors", []):
@@ -160,34 +223,23 @@ class TestReporter:
                     "message": error["message"]
                 })
             
-            # Aggregate performance metrics
+            # Collect performance metric values per metric for vectorized reduction
             for metric, values in result.get("performance_metrics", {}).items():
-                if metric not in report["performance_summary"]:
-                    report["performance_summary"][metric] = {
-                        "min": float('inf'),
-                        "max": float('-inf'),
-                        "total": 0,
-                        "count": 0
-                    }
-                
-                for value_data in values:
-                    value = value_data["value"]
-                    report["performance_summary"][metric]["min"] = min(
-                        report["performance_summary"][metric]["min"],
-                        value
-                    )
-                    report["performance_summary"][metric]["max"] = max(
-                        report["performance_summary"][metric]["max"],
-                        value
-                    )
-                    report["performance_summary"][metric]["total"] += value
-                    report["performance_summary"][metric]["count"] += 1
-        
-        # Calculate averages
-        for metric in report["performance_summary"].values():
-            metric["average"] = metric["total"] / metric["count"]
-            del metric["total"]
-            del metric["count"]
+                metric_values[metric].extend(value_data["value"] for value_data in values)
+        
+        # Reduce each metric's values as one contiguous float64 array
+        for metric, values in metric_values.items():
+            if not values:
+                continue
+            arr = np.fromiter(values, dtype=np.float64, count=len(values))
+            report["performance_summary"][metric] = {
+                "min": float(arr.min()),
+                "max": float(arr.max()),
+                "average": float(arr.mean())
+            }
+        
+        if all_results is not None:
+            report["test_results"] = all_results
         
         return report
     
@@ -199,7 +251,7 @@ class TestReporter:
         
         report_file = os.path.join(self.log_dir, filename)
         
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        with open(report_file, 'wb') as f:
+            f.write(orjson.dumps(report, option=RESULT_JSON_OPTIONS))
         
         return report_file 
\ No newline at end of file
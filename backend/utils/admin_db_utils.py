@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
@@ -9,9 +10,11 @@ load_dotenv('/Users/sreeramyashasviv/projects/MISC./AGENTIC-PLAYGROUND/.env')
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://lgowncnnkdxptuvnsrvw.supabase.co")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
+@lru_cache(maxsize=1)
 def get_admin_client():
     """
     Returns a Supabase client initialized with the service key for admin operations.
+    The client is created once and shared by every caller.
     """
     if not SUPABASE_SERVICE_KEY:
         raise RuntimeError("SUPABASE_SERVICE_KEY is not set in environment variables.")
@@ -34,7 +37,17 @@ def setup_database():
         # We can perform administrative operations via the Supabase REST API
         # For most operations, we'll need to use the Supabase Dashboard or SQL Editor
         
-        # For now, we'll check if our tables exist by attempting to select from them
+        # Both tables exist if the test_counts function (see SUPABASE-DIAGNOSTICS.md) can
+        # count them, which takes one round-trip instead of one per table
+        try:
+            counts = supabase.rpc("test_counts").execute().data[0]
+            print(f"Uploads table exists with {counts['uploads_count']} rows.")
+            print(f"Document chunks table exists with {counts['chunks_count']} rows.")
+            return True
+        except Exception as e:
+            print(f"Could not count both tables in one call ({e}), checking each table separately")
+        
+        # Otherwise check each table by attempting to select from it
         # If they don't exist, we'll assume the tables need to be created via Supabase Dashboard
         
         try:
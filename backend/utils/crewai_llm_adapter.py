@@ -1,13 +1,26 @@
 from typing import Any, Dict, List, Optional
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk, HumanMessage
 from langchain_core.outputs import ChatResult, ChatGeneration, ChatGenerationChunk
 from langchain_core.callbacks import CallbackManagerForLLMRun
 from langchain_core.callbacks.manager import AsyncCallbackManagerForLLMRun
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 import os
+import asyncio
 from pydantic import PrivateAttr
 
+# Anthropic clients shared across ChatAnthropic instances, keyed by API key,
+# so every adapter reuses the same connection pool
+_CLIENTS: Dict[Optional[str], Anthropic] = {}
+_ASYNC_CLIENTS: Dict[Optional[str], AsyncAnthropic] = {}
+
+def _get_client(cache: Dict[Optional[str], Any], client_cls: type, api_key: Optional[str]) -> Any:
+    """Return the cached client for api_key, creating it on first use"""
+    client = cache.get(api_key)
+    if client is None:
+        client = cache.setdefault(api_key, client_cls(api_key=api_key))
+    return client
+
 class ChatAnthropic(BaseChatModel):
     """Anthropic chat model."""
     
@@ -15,10 +28,12 @@ class ChatAnthropic(BaseChatModel):
     temperature: float = 0.7
     api_key: str = os.getenv("ANTHROPIC_API_KEY")
     _client: Any = PrivateAttr()
+    _async_client: Any = PrivateAttr()
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        object.__setattr__(self, '_client', Anthropic(api_key=self.api_key))
+        object.__setattr__(self, '_client', _get_client(_CLIENTS, Anthropic, self.api_key))
+        object.__setattr__(self, '_async_client', _get_client(_ASYNC_CLIENTS, AsyncAnthropic, self.api_key))
 
     def _generate(
         self,
@@ -45,7 +60,7 @@ class ChatAnthropic(BaseChatModel):
         **kwargs: Any,
     ) -> ChatResult:
         message_content = "\n".join([m.content for m in messages])
-        response = await self._client.messages.create(
+        response = await self._async_client.messages.create(
             model=self.model,
             max_tokens=4096,
             temperature=self.temperature,
@@ -76,6 +91,13 @@ class CrewAILLMAdapter:
         return result
 
     async def agenerate(self, prompts: list, max_tokens: int = 512, **kwargs):
-        """Asynchronous generate method for CrewAI Agents."""
-        result = await self.llm._agenerate([{"role": "user", "content": p} for p in prompts], max_tokens=max_tokens, **kwargs)
-        return result
+        """
+        Asynchronous generate method for CrewAI Agents.
+        Each prompt is sent as its own request and all of them run concurrently;
+        the generations are returned in prompt order.
+        """
+        results = await asyncio.gather(*[
+            self.llm._agenerate([HumanMessage(content=p)], max_tokens=max_tokens, **kwargs)
+            for p in prompts
+        ])
+        return ChatResult(generations=[g for result in results for g in result.generations])
@@ -5,6 +5,15 @@ import asyncpg
 
 _SUPABASE_DATABASE_URL = os.getenv("SUPABASE_DATABASE_URL")
 
+# Pool sizing kept well under Supavisor's per-project connection limit
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 10
+POOL_COMMAND_TIMEOUT = 30  # seconds
+POOL_MAX_INACTIVE_LIFETIME = 300  # seconds before idle connections are closed
+# Prepared statements cached per connection; set to 0 when connecting through
+# a transaction-mode pooler, which cannot hold server-side prepared statements
+POOL_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "1024"))
+
 _pool = None
 
 async def get_db_pool():
@@ -12,11 +21,24 @@ async def get_db_pool():
     if _pool is None:
         if not _SUPABASE_DATABASE_URL:
             raise RuntimeError("SUPABASE_DATABASE_URL is not set in environment variables.")
-        _pool = await asyncpg.create_pool(_SUPABASE_DATABASE_URL)
+        _pool = await asyncpg.create_pool(
+            _SUPABASE_DATABASE_URL,
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            command_timeout=POOL_COMMAND_TIMEOUT,
+            max_inactive_connection_lifetime=POOL_MAX_INACTIVE_LIFETIME,
+            statement_cache_size=POOL_STATEMENT_CACHE_SIZE
+        )
     return _pool
 
 async def test_connection():
     pool = await get_db_pool()
     async with pool.acquire() as conn:
-        result = await conn.fetchval("SELECT 1;")
-        return result 
\ No newline at end of file
+        result = await conn.fetchval("SELECT 1")
+        return result 
+
+async def close_db_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -1,17 +1,33 @@
-import json
 import logging
 import time
 import asyncio
 from typing import Dict, Any, Optional
 from datetime import datetime
 from functools import wraps
+import orjson
 import psutil
 import os
 
+# Extra fields and metrics may carry numpy values and non-string keys
+LOG_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
 class JSONFormatter(logging.Formatter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Whole-second ISO prefix, reused for every record within that second
+        self._cached_second = None
+        self._cached_prefix = ""
+
+    def _format_timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._cached_second:
+            self._cached_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._cached_second = second
+        return f"{self._cached_prefix}.{int((created - second) * 1e6):06d}"
+
     def format(self, record):
         log_obj = {
-            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
+            "timestamp": self._format_timestamp(record.created),
             "level": record.levelname,
             "message": record.getMessage(),
             "logger": record.name,
@@ -28,7 +44,7 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "metrics"):
             log_obj["metrics"] = record.metrics
             
-        return json.dumps(log_obj)
+        return orjson.dumps(log_obj, default=str, option=LOG_JSON_OPTIONS).decode()
 
 class MetricsLogger:
     def __init__(self, service_name: str):
@@ -81,67 +97,59 @@ def setup_json_logging(service_name: str):
 def log_execution_time(logger: logging.Logger):
     """Decorator to log execution time of functions"""
     def decorator(func):
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            start_time = time.time()
-            try:
-                result = await func(*args, **kwargs)
-                execution_time = time.time() - start_time
-                logger.info(
-                    f"{func.__name__} completed",
-                    extra={
-                        "metrics": {
-                            "function": func.__name__,
-                            "execution_time": execution_time
-                        }
+        # Bind everything the wrappers need once, at decoration time
+        _time = time.time
+        _info = logger.info
+        _error = logger.error
+        func_name = func.__name__
+        completed_message = f"{func_name} completed"
+
+        def _log_completed(execution_time):
+            _info(
+                completed_message,
+                extra={
+                    "metrics": {
+                        "function": func_name,
+                        "execution_time": execution_time
+                    }
+                }
+            )
+
+        def _log_failed(execution_time, e):
+            _error(
+                f"{func_name} failed: {str(e)}",
+                extra={
+                    "metrics": {
+                        "function": func_name,
+                        "execution_time": execution_time,
+                        "error": str(e)
                     }
-                )
+                },
+                exc_info=True
+            )
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_time = _time()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    _log_failed(_time() - start_time, e)
+                    raise
+                _log_completed(_time() - start_time)
                 return result
-            except Exception as e:
-                execution_time = time.time() - start_time
-                logger.error(
-                    f"{func.__name__} failed: {str(e)}",
-                    extra={
-                        "metrics": {
-                            "function": func.__name__,
-                            "execution_time": execution_time,
-                            "error": str(e)
-                        }
-                    },
-                    exc_info=True
-                )
-                raise
-                
+            return async_wrapper
+
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = _time()
             try:
                 result = func(*args, **kwargs)
-                execution_time = time.time() - start_time
-                logger.info(
-                    f"{func.__name__} completed",
-                    extra={
-                        "metrics": {
-                            "function": func.__name__,
-                            "execution_time": execution_time
-                        }
-                    }
-                )
-                return result
             except Exception as e:
-                execution_time = time.time() - start_time
-                logger.error(
-                    f"{func.__name__} failed: {str(e)}",
-                    extra={
-                        "metrics": {
-                            "function": func.__name__,
-                            "execution_time": execution_time,
-                            "error": str(e)
-                        }
-                    },
-                    exc_info=True
-                )
+                _log_failed(_time() - start_time, e)
                 raise
-        
-        return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
-    return decorator 
\ No newline at end of file
+            _log_completed(_time() - start_time)
+            return result
+        return sync_wrapper
+    return decorator
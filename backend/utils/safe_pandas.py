@@ -1,9 +1,50 @@
 """Safe wrapper for pandas operations in sandbox environment."""
 import pandas as pd
 import numpy as np
-from typing import Any, Dict, List, Optional, Union
+from collections import OrderedDict
+from functools import cached_property, wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from utils.sandbox_utils import sandbox_decorator
 
+# Reduction results remembered per SafeDataFrame, evicted least recently used first
+REDUCTION_CACHE_SIZE = 128
+
+_MISSING = object()
+
+def _memoize(copy_result: Optional[Callable[[Any], Any]] = None) -> Callable:
+    """
+    Cache a read-only reduction per instance, keyed by method name and arguments.
+    Mutable results are handed out through copy_result so callers can't alter the cache.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            cache = self._reduction_cache
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = cache[key] = func(self, *args, **kwargs)
+                if len(cache) > REDUCTION_CACHE_SIZE:
+                    cache.popitem(last=False)
+            else:
+                cache.move_to_end(key)
+            return copy_result(value) if copy_result else value
+        return wrapper
+    return decorator
+
+def _top_k_indices(counts: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Positions of the limit largest counts, largest first, ties kept in their original order.
+    When there are many more counts than limit, only the top entries are selected and sorted.
+    """
+    if 0 < limit and counts.size > limit * 4:
+        kth = np.partition(counts, counts.size - limit)[counts.size - limit]
+        top = np.flatnonzero(counts > kth)
+        ties = np.flatnonzero(counts == kth)[:limit - top.size]
+        top = np.concatenate([top, ties])
+        return top[np.lexsort((top, -counts[top]))]
+    return np.argsort(-counts, kind='stable')[:limit]
+
 class SafeDataFrame:
     """
     A secure wrapper around pandas DataFrame that only allows safe operations.
@@ -12,6 +53,10 @@ class SafeDataFrame:
     def __init__(self, df: pd.DataFrame):
         """Initialize with a pandas DataFrame."""
         self._df = df
+        # Column names as a set for O(1) membership checks
+        self._col_set = frozenset(df.columns)
+        # Results of pure reductions over the (never modified) wrapped frame
+        self._reduction_cache: OrderedDict = OrderedDict()
         
     @property
     def columns(self) -> List[str]:
@@ -26,48 +71,66 @@ class SafeDataFrame:
     @sandbox_decorator
     def head(self, n: int = 5) -> Dict[str, List[Any]]:
         """Get first n rows as a dictionary."""
-        return self._df.head(n).to_dict('list')
+        # Slice each column's backing array instead of building a head() DataFrame
+        head = {}
+        for name, column in self._df.items():
+            values = column._values
+            if isinstance(values, np.ndarray) and values.dtype != object:
+                head[name] = values[:n].tolist()
+            else:
+                # Object and extension columns keep to_dict's boxing of missing values
+                head[name] = column.iloc[:n].to_frame().to_dict('list')[name]
+        return head
         
+    @_memoize(lambda stats: {k: dict(v) for k, v in stats.items()})
     @sandbox_decorator
     def describe(self) -> Dict[str, Dict[str, float]]:
         """Get statistical description of numeric columns."""
         return self._df.describe().to_dict()
         
+    @_memoize(dict)
     @sandbox_decorator
     def value_counts(self, column: str, limit: int = 10) -> Dict[str, int]:
         """Get value counts for a column."""
-        if column not in self._df.columns:
+        if column not in self._col_set:
             raise ValueError(f"Column {column} not found")
-        return dict(self._df[column].value_counts().head(limit))
+        # Count in order of appearance, then select the top entries without a full sort
+        counts = self._df[column].value_counts(sort=False)
+        return counts.iloc[_top_k_indices(counts.to_numpy(), limit)].to_dict()
         
+    @_memoize()
     @sandbox_decorator
     def mean(self, column: str) -> float:
         """Get mean of a numeric column."""
-        if column not in self._df.columns:
+        if column not in self._col_set:
             raise ValueError(f"Column {column} not found")
         return float(self._df[column].mean())
         
+    @_memoize()
     @sandbox_decorator
     def sum(self, column: str) -> float:
         """Get sum of a numeric column."""
-        if column not in self._df.columns:
+        if column not in self._col_set:
             raise ValueError(f"Column {column} not found")
         return float(self._df[column].sum())
         
+    @_memoize()
     @sandbox_decorator
     def min(self, column: str) -> Any:
         """Get minimum value of a column."""
-        if column not in self._df.columns:
+        if column not in self._col_set:
             raise ValueError(f"Column {column} not found")
         return self._df[column].min()
         
+    @_memoize()
     @sandbox_decorator
     def max(self, column: str) -> Any:
         """Get maximum value of a column."""
-        if column not in self._df.columns:
+        if column not in self._col_set:
             raise ValueError(f"Column {column} not found")
         return self._df[column].max()
         
+    @_memoize(dict)
     @sandbox_decorator
     def groupby(self, by: str, agg_column: str, agg_func: str) -> Dict[str, float]:
         """
@@ -82,35 +145,88 @@ class SafeDataFrame:
         if agg_func not in allowed_funcs:
             raise ValueError(f"Aggregation function must be one of: {allowed_funcs}")
             
-        if by not in self._df.columns or agg_column not in self._df.columns:
+        if not self._col_set.issuperset((by, agg_column)):
             raise ValueError("Column not found")
             
-        grouped = self._df.groupby(by)[agg_column].agg(agg_func)
-        return dict(grouped)
+        # Call the typed reduction directly; order and unused categories don't matter for a dict
+        grouped = self._df.groupby(by, sort=False, observed=True)[agg_column]
+        aggregations = {
+            'mean': grouped.mean,
+            'sum': grouped.sum,
+            'count': grouped.count,
+            'min': grouped.min,
+            'max': grouped.max,
+        }
+        return aggregations[agg_func]().to_dict()
         
+    @_memoize()
     @sandbox_decorator
     def correlation(self, column1: str, column2: str) -> float:
         """Get correlation between two numeric columns."""
-        if column1 not in self._df.columns or column2 not in self._df.columns:
+        if not self._col_set.issuperset((column1, column2)):
             raise ValueError("Column not found")
-        return float(self._df[column1].corr(self._df[column2]))
+        a = self._df[column1].to_numpy(dtype=np.float64, na_value=np.nan, copy=False)
+        b = self._df[column2].to_numpy(dtype=np.float64, na_value=np.nan, copy=False)
+        # Pearson correlation over rows where neither value is NaN, as Series.corr does;
+        # an infinite value is kept and makes the result NaN
+        mask = ~(np.isnan(a) | np.isnan(b))
+        a, b = a[mask], b[mask]
+        if len(a) < 2:
+            return float('nan')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            a = a - a.mean()
+            b = b - b.mean()
+            return float(np.dot(a, b) / np.sqrt(np.dot(a, a) * np.dot(b, b)))
         
     @sandbox_decorator
     def filter_by_value(self, column: str, value: Any) -> 'SafeDataFrame':
         """Filter DataFrame by column value."""
-        if column not in self._df.columns:
+        if column not in self._col_set:
             raise ValueError(f"Column {column} not found")
-        return SafeDataFrame(self._df[self._df[column] == value])
+        series = self._df[column]
+        values = series._values
+        mask = None
+        if pd.api.types.is_scalar(value) and pd.isna(value):
+            # None and NA never compare equal under pandas; leave them to its comparison
+            pass
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            # Compare the integer category codes instead of the category values
+            try:
+                code = series.cat.categories.get_loc(value)
+            except (KeyError, TypeError):
+                code = None
+            if isinstance(code, int):
+                mask = series.cat.codes.to_numpy() == code
+        elif isinstance(values, np.ndarray) and values.dtype.kind in 'biufc':
+            result = values == value
+            if isinstance(result, np.ndarray) and result.dtype == bool:
+                mask = result
+        
+        if mask is None:
+            # Values pandas must compare itself (object and extension dtypes, missing
+            # values, missing categories)
+            return SafeDataFrame(self._df[series == value])
+        return SafeDataFrame(self._df.iloc[mask])
+        
+    @cached_property
+    def _numeric_columns(self) -> Tuple[str, ...]:
+        """Numeric column names, computed once since the wrapped frame never changes."""
+        return tuple(self._df.select_dtypes(include=[np.number]).columns)
+        
+    @cached_property
+    def _categorical_columns(self) -> Tuple[str, ...]:
+        """Non-numeric column names, computed once since the wrapped frame never changes."""
+        return tuple(self._df.select_dtypes(exclude=[np.number]).columns)
         
     @sandbox_decorator
     def get_numeric_columns(self) -> List[str]:
         """Get list of numeric columns."""
-        return list(self._df.select_dtypes(include=[np.number]).columns)
+        return list(self._numeric_columns)
         
     @sandbox_decorator
     def get_categorical_columns(self) -> List[str]:
         """Get list of categorical columns."""
-        return list(self._df.select_dtypes(exclude=[np.number]).columns)
+        return list(self._categorical_columns)
         
     @sandbox_decorator
     def to_dict(self, orient: str = 'records') -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
@@ -120,6 +236,26 @@ class SafeDataFrame:
             raise ValueError(f"Orient must be one of: {allowed_orients}")
         return self._df.to_dict(orient)
 
+def _make_columns_contiguous(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Give every strided numeric column its own contiguous array.
+    Frames built from 2D row-major arrays store columns with a row-sized stride,
+    which slows down every column-wise reduction.
+    """
+    strided = [
+        i for i, (_, column) in enumerate(df.items())
+        if pd.api.types.is_numeric_dtype(column.dtype)
+        and isinstance(column._values, np.ndarray)
+        and not column._values.flags.c_contiguous
+    ]
+    if not strided:
+        return df
+    
+    df = df.copy(deep=False)
+    for i in strided:
+        df.isetitem(i, np.ascontiguousarray(df.iloc[:, i].to_numpy()))
+    return df
+
 def create_safe_dataframe(df: pd.DataFrame) -> SafeDataFrame:
     """Create a SafeDataFrame instance from a pandas DataFrame."""
-    return SafeDataFrame(df) 
\ No newline at end of file
+    return SafeDataFrame(_make_columns_contiguous(df)) 
\ No newline at end of file
@@ -2,10 +2,12 @@
 import RestrictedPython
 from RestrictedPython import compile_restricted, safe_globals
 import psutil
+import re
 import threading
 import time
-from typing import Dict, Any, Optional, Callable
-from functools import wraps
+from typing import Dict, Any, List, Optional, Callable, Pattern, Set, Tuple
+from functools import lru_cache, wraps
+from types import CodeType
 import logging
 from utils.logging_utils import setup_json_logging
 
@@ -20,54 +22,130 @@ class SecurityViolation(Exception):
     """Exception raised when a security violation is detected."""
     pass
 
+# Seconds between resource checks in the shared monitor thread
+MONITOR_INTERVAL = 0.1
+DEFAULT_MAX_MEMORY_MB = 500
+DEFAULT_MAX_CPU_PERCENT = 50
+
+# Handle on the current process, reused by every resource check
+_PROCESS = psutil.Process()
+
 class ResourceMonitor:
-    """Monitor and limit resource usage during code execution."""
+    """
+    Process-wide monitor of resource usage during sandboxed execution.
+    One daemon thread samples the process and checks it against the limits of every
+    registered thread. Memory is limited by RSS growth since the call registered, so memory
+    the process already held doesn't count against it; a violation is recorded and raised
+    by that thread once its call ends, while CPU overuse is only logged.
+    """
     
-    def __init__(self, max_memory_mb: float = 500, max_cpu_percent: float = 50):
-        self.max_memory_bytes = max_memory_mb * 1024 * 1024
-        self.max_cpu_percent = max_cpu_percent
-        self.should_stop = False
+    def __init__(self, interval: float = MONITOR_INTERVAL):
+        self.interval = interval
+        self._limits: Dict[int, Tuple[float, float]] = {}
+        self._violations: Dict[int, str] = {}
+        # Threads whose CPU overuse has already been logged during the current call
+        self._cpu_reported: Set[int] = set()
+        self._lock = threading.Lock()
+        # Set while any thread is registered; the monitor parks on it when idle
+        self._has_work = threading.Event()
         self._monitor_thread = None
         
-    def start_monitoring(self):
-        """Start the resource monitoring thread."""
-        self.should_stop = False
-        self._monitor_thread = threading.Thread(target=self._monitor_resources)
-        self._monitor_thread.daemon = True
-        self._monitor_thread.start()
+    def register(self, thread_id: int, max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+                 max_cpu_percent: float = DEFAULT_MAX_CPU_PERCENT) -> bool:
+        """
+        Start monitoring limits for a thread.
+        Returns False if the thread is already registered (a nested sandboxed call).
+        """
+        # Process RSS at entry; the call may grow memory by at most max_memory_mb beyond it
+        baseline = _PROCESS.memory_info().rss
+        with self._lock:
+            if thread_id in self._limits:
+                return False
+            self._limits[thread_id] = (baseline + max_memory_mb * 1024 * 1024, max_cpu_percent)
+            self._has_work.set()
+            if self._monitor_thread is None:
+                self._monitor_thread = threading.Thread(
+                    target=self._monitor_resources, name="sandbox-monitor", daemon=True
+                )
+                self._monitor_thread.start()
+            return True
         
-    def stop_monitoring(self):
-        """Stop the resource monitoring thread."""
-        self.should_stop = True
-        if self._monitor_thread:
-            self._monitor_thread.join()
+    def unregister(self, thread_id: int) -> Optional[str]:
+        """Stop monitoring a thread and return its recorded violation, if any."""
+        with self._lock:
+            self._limits.pop(thread_id, None)
+            if not self._limits:
+                self._has_work.clear()
+            self._cpu_reported.discard(thread_id)
+            return self._violations.pop(thread_id, None)
             
     def _monitor_resources(self):
-        """Monitor memory and CPU usage."""
-        process = psutil.Process()
-        while not self.should_stop:
+        """Monitor memory and CPU usage for all registered threads."""
+        # CPU time and wall clock at the previous tick; reset while nothing is monitored
+        last_cpu_time = last_wall_time = None
+        while True:
+            if not self._has_work.is_set():
+                last_cpu_time = None
+                self._has_work.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                limits = list(self._limits.items())
+            if not limits:
+                continue
+            
             try:
-                # Check memory usage
-                memory_info = process.memory_info()
-                if memory_info.rss > self.max_memory_bytes:
+                memory = _PROCESS.memory_info().rss
+                cpu_times = _PROCESS.cpu_times()
+            except psutil.NoSuchProcess:
+                break
+            
+            # CPU usage over the last tick from cpu_times deltas; the first tick only sets a baseline
+            cpu_time = cpu_times.user + cpu_times.system
+            wall_time = time.monotonic()
+            cpu_percent = 0.0
+            if last_cpu_time is not None and wall_time > last_wall_time:
+                cpu_percent = (cpu_time - last_cpu_time) / (wall_time - last_wall_time) * 100
+            last_cpu_time, last_wall_time = cpu_time, wall_time
+            
+            violations = {}
+            for thread_id, (memory_ceiling, max_cpu_percent) in limits:
+                if memory > memory_ceiling:
                     logger.error("Memory limit exceeded", extra={
-                        "current_memory": memory_info.rss,
-                        "limit": self.max_memory_bytes
+                        "current_memory": memory,
+                        "limit": memory_ceiling
                     })
-                    raise ResourceLimitExceeded("Memory usage exceeded limit")
-                
-                # Check CPU usage
-                cpu_percent = process.cpu_percent()
-                if cpu_percent > self.max_cpu_percent:
-                    logger.error("CPU limit exceeded", extra={
+                    violations[thread_id] = "Memory usage exceeded limit"
+                elif cpu_percent > max_cpu_percent and thread_id not in self._cpu_reported:
+                    # CPU percent covers the whole process, so it can't be pinned on one
+                    # call; it is logged once per call rather than failing the call
+                    logger.warning("CPU limit exceeded", extra={
                         "cpu_percent": cpu_percent,
-                        "limit": self.max_cpu_percent
+                        "limit": max_cpu_percent
                     })
-                    raise ResourceLimitExceeded("CPU usage exceeded limit")
-                
-                time.sleep(0.1)  # Check every 100ms
-            except psutil.NoSuchProcess:
-                break
+                    self._cpu_reported.add(thread_id)
+            
+            if violations:
+                with self._lock:
+                    for thread_id, message in violations.items():
+                        # Keep the first violation, and drop ones for calls that already finished
+                        if thread_id in self._limits:
+                            self._violations.setdefault(thread_id, message)
+
+_GLOBAL_MONITOR = ResourceMonitor()
+
+def _run_monitored(func: Callable, *args, **kwargs) -> Any:
+    """Run func under the shared resource monitor, raising if a limit was exceeded."""
+    thread_id = threading.get_ident()
+    if not _GLOBAL_MONITOR.register(thread_id):
+        # Already monitored by an enclosing sandboxed call
+        return func(*args, **kwargs)
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        violation = _GLOBAL_MONITOR.unregister(thread_id)
+    if violation:
+        raise ResourceLimitExceeded(violation)
+    return result
 
 def get_safe_globals() -> Dict[str, Any]:
     """
@@ -97,15 +175,28 @@ def sandbox_decorator(func: Callable) -> Callable:
     """
     @wraps(func)
     def wrapper(*args, **kwargs):
-        monitor = ResourceMonitor()
-        try:
-            monitor.start_monitoring()
-            result = func(*args, **kwargs)
-            return result
-        finally:
-            monitor.stop_monitoring()
+        return _run_monitored(func, *args, **kwargs)
     return wrapper
 
+# Compiled sandbox programs kept for repeated (e.g. template-generated) code
+COMPILE_CACHE_SIZE = 256
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile_safe(code: str) -> CodeType:
+    """Compile code with RestrictedPython, reusing the result for identical source."""
+    return compile_restricted(code, '<string>', 'exec')
+
+def _forbidden_terms_pattern(terms: List[str]) -> Pattern[str]:
+    """
+    Compile terms into one alternation matched on word boundaries.
+    A term ending in punctuation (such as 'os.') gets no trailing boundary.
+    """
+    alternatives = (
+        rf"\b{re.escape(term)}\b" if term[-1].isalnum() or term[-1] == '_' else rf"\b{re.escape(term)}"
+        for term in terms
+    )
+    return re.compile('|'.join(alternatives))
+
 class CodeValidator:
     """Validate code before execution in the sandbox."""
     
@@ -114,24 +205,33 @@ class CodeValidator:
         'file', 'system', 'os.', 'subprocess',
         '__import__', 'breakpoint', 'globals',
     ]
+    # All forbidden terms in one pattern, so the code is scanned once
+    _FORBIDDEN_RE = _forbidden_terms_pattern(FORBIDDEN_TERMS)
     
     @classmethod
-    def validate_code(cls, code: str) -> bool:
+    def compile_code(cls, code: str) -> CodeType:
         """
-        Validate code for potential security issues.
-        Returns True if code is safe, raises SecurityViolation otherwise.
+        Validate code for potential security issues and return its restricted byte code.
+        Raises SecurityViolation if the code is unsafe or does not compile.
         """
         # Check for forbidden terms
-        for term in cls.FORBIDDEN_TERMS:
-            if term in code:
-                raise SecurityViolation(f"Forbidden term found in code: {term}")
+        match = cls._FORBIDDEN_RE.search(code)
+        if match:
+            raise SecurityViolation(f"Forbidden term found in code: {match.group(0)}")
         
         try:
-            # Try to compile the code to check for syntax errors
-            compile_restricted(code, '<string>', 'exec')
-            return True
+            return _compile_safe(code)
         except Exception as e:
             raise SecurityViolation(f"Code validation failed: {str(e)}")
+    
+    @classmethod
+    def validate_code(cls, code: str) -> bool:
+        """
+        Validate code for potential security issues.
+        Returns True if code is safe, raises SecurityViolation otherwise.
+        """
+        cls.compile_code(code)
+        return True
 
 def execute_in_sandbox(code: str, globals_dict: Optional[Dict[str, Any]] = None) -> Any:
     """
@@ -150,27 +250,19 @@ def execute_in_sandbox(code: str, globals_dict: Optional[Dict[str, Any]] = None)
         Exception: For other execution errors
     """
     try:
-        # Validate code
-        CodeValidator.validate_code(code)
+        # Validate and compile code in one pass
+        byte_code = CodeValidator.compile_code(code)
         
         # Prepare globals
         execution_globals = get_safe_globals()
         if globals_dict:
             execution_globals.update(globals_dict)
         
-        # Compile and execute
-        byte_code = compile_restricted(code, '<string>', 'exec')
-        
         # Create a new dictionary for locals
         locals_dict = {}
         
         # Execute with resource monitoring
-        monitor = ResourceMonitor()
-        try:
-            monitor.start_monitoring()
-            exec(byte_code, execution_globals, locals_dict)
-        finally:
-            monitor.stop_monitoring()
+        _run_monitored(exec, byte_code, execution_globals, locals_dict)
         
         # Return the result if available
         if 'result' in locals_dict:
@@ -1,7 +1,8 @@
 """Utilities for transaction management and resource cleanup."""
+import heapq
 import os
 import shutil
-from typing import Dict, List, Any, Callable, Optional
+from typing import Dict, List, Any, Callable, Optional, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
 import logging
@@ -15,6 +16,22 @@ class CleanupError(Exception):
     """Exception raised when cleanup operations fail."""
     pass
 
+def _remove_path(path: Path) -> bool:
+    """
+    Delete a file or directory without a separate existence check.
+    Returns False if the path was already gone.
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        return False
+    except (IsADirectoryError, PermissionError):
+        # unlink refuses directories (EISDIR on Linux, EPERM on macOS)
+        if not path.is_dir():
+            raise
+        shutil.rmtree(path)
+    return True
+
 class Resource:
     """Base class for managed resources."""
     def __init__(self, resource_id: str, resource_type: str):
@@ -39,11 +56,7 @@ class FileResource(Resource):
     def cleanup(self):
         """Delete the file or directory."""
         try:
-            if self.file_path.exists():
-                if self.file_path.is_dir():
-                    shutil.rmtree(self.file_path)
-                else:
-                    self.file_path.unlink()
+            if _remove_path(self.file_path):
                 logger.info(f"Cleaned up {self.resource_type}", extra={
                     "path": str(self.file_path),
                     "is_temp": self.is_temp
@@ -83,23 +96,55 @@ class Transaction:
             "resource_id": resource.resource_id
         })
         
+    def _cleanup_files(self, files: List[FileResource]) -> List[Any]:
+        """
+        Delete registered files in one batch, returning (resource, error) pairs.
+        Paths inside a registered directory are skipped, since removing the directory covers them.
+        """
+        directories = {f.file_path for f in files if f.file_path.is_dir()}
+        failures = []
+        removed = 0
+        for resource in files:
+            path = resource.file_path
+            if directories and any(parent in directories for parent in path.parents):
+                continue
+            try:
+                removed += _remove_path(path)
+            except Exception as e:
+                failures.append((resource, e))
+        
+        if removed:
+            logger.info("Cleaned up files", extra={
+                "request_id": self.request_id,
+                "count": removed
+            })
+        return failures
+        
     def cleanup(self):
         """Clean up all registered resources."""
-        errors = []
+        files = []
+        failures = []
         for resource in reversed(self.resources):  # Clean up in reverse order
+            if type(resource) is FileResource:
+                files.append(resource)
+                continue
             try:
                 resource.cleanup()
             except Exception as e:
-                errors.append(str(e))
+                failures.append((resource, e))
+        if files:
+            failures.extend(self._cleanup_files(files))
+        
+        if failures:
+            for resource, e in failures:
                 logger.error("Resource cleanup failed", extra={
                     "request_id": self.request_id,
                     "resource_type": resource.resource_type,
                     "resource_id": resource.resource_id,
                     "error": str(e)
                 })
-        
-        if errors:
-            raise CleanupError(f"Cleanup errors occurred: {'; '.join(errors)}")
+            errors = "; ".join(str(e) for _, e in failures)
+            raise CleanupError(f"Cleanup errors occurred: {errors}")
             
     def rollback(self):
         """Roll back changes by cleaning up resources after a failure."""
@@ -146,6 +191,8 @@ class TransactionManager:
     def __init__(self, max_age_hours: int = 24):
         self.max_age = timedelta(hours=max_age_hours)
         self.active_transactions: Dict[str, Transaction] = {}
+        # Min-heap of (started_at, request_id) so the oldest transactions are found first
+        self._by_age: List[Tuple[datetime, str]] = []
         
     def start_transaction(self, request_id: str) -> Transaction:
         """Start a new transaction."""
@@ -154,17 +201,19 @@ class TransactionManager:
             
         transaction = Transaction(request_id)
         self.active_transactions[request_id] = transaction
+        heapq.heappush(self._by_age, (transaction.started_at, request_id))
         return transaction
         
     def cleanup_old_transactions(self):
         """Clean up transactions older than max_age."""
         now = datetime.utcnow()
-        old_transactions = [
-            (rid, txn) for rid, txn in self.active_transactions.items()
-            if now - txn.started_at > self.max_age
-        ]
-        
-        for request_id, transaction in old_transactions:
+        retry = []
+        while self._by_age and now - self._by_age[0][0] > self.max_age:
+            started_at, request_id = heapq.heappop(self._by_age)
+            transaction = self.active_transactions.get(request_id)
+            # Skip stale entries for transactions that were removed or replaced
+            if transaction is None or transaction.started_at != started_at:
+                continue
             try:
                 transaction.cleanup()
                 del self.active_transactions[request_id]
@@ -173,10 +222,15 @@ class TransactionManager:
                     "age_hours": (now - transaction.started_at).total_seconds() / 3600
                 })
             except Exception as e:
+                # Keep it tracked so the next run retries the cleanup
+                retry.append((started_at, request_id))
                 logger.error("Failed to clean up old transaction", extra={
                     "request_id": request_id,
                     "error": str(e)
                 })
+        
+        for entry in retry:
+            heapq.heappush(self._by_age, entry)
 
 # Create global transaction manager
 transaction_manager = TransactionManager() 
\ No newline at end of file
@@ -1,6 +1,8 @@
 """Utilities for data validation and type conversion."""
+import math
+from functools import lru_cache
 import numpy as np
-from typing import Any, Dict, Union, Optional
+from typing import Any, Dict, List, Tuple, Union, Optional
 from datetime import datetime
 import pandas as pd
 
@@ -9,6 +11,13 @@ def sanitize_numeric(value: Any) -> Optional[float]:
     Sanitize numeric values, handling NaN, infinity, and numpy types.
     Returns None for invalid values.
     """
+    # Fast path for native Python numbers, the common case after to_dict()
+    value_type = type(value)
+    if value_type is float:
+        return value if math.isfinite(value) else None
+    if value_type is int:
+        return float(value)
+    
     if value is None:
         return None
         
@@ -49,22 +58,66 @@ def sanitize_categorical(value: Any) -> Optional[str]:
     except (ValueError, TypeError):
         return None
 
-def validate_statistics_dict(stats: Dict[str, Any]) -> Dict[str, Any]:
+def _collect_statistics_leaves(stats: Dict[str, Any], cleaned: Dict[str, Any],
+                               slots: List[Tuple[Dict[str, Any], str]], values: List[Any]):
     """
-    Validate and clean statistics dictionary, ensuring all numeric values are valid.
+    Copy the nesting of stats into cleaned, recording each leaf's target slot and raw value.
     """
-    cleaned = {}
     for key, value in stats.items():
         if isinstance(value, dict):
-            cleaned[key] = validate_statistics_dict(value)
+            nested = cleaned[key] = {}
+            _collect_statistics_leaves(value, nested, slots, values)
         else:
-            cleaned_value = sanitize_numeric(value)
-            if cleaned_value is not None:
-                cleaned[key] = cleaned_value
-            else:
-                cleaned[key] = 0.0  # Default value for invalid numerics
+            cleaned[key] = None
+            slots.append((cleaned, key))
+            values.append(value)
+
+def _is_numpy_temporal(value: Any) -> bool:
+    """Whether value is a numpy datetime64/timedelta64 scalar or array."""
+    dtype = getattr(value, 'dtype', None)
+    return isinstance(dtype, np.dtype) and dtype.kind in 'mM'
+
+def validate_statistics_dict(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate and clean statistics dictionary, ensuring all numeric values are valid.
+    All leaves are sanitized in one vectorized pass; invalid numerics default to 0.0.
+    """
+    cleaned = {}
+    slots: List[Tuple[Dict[str, Any], str]] = []
+    values: List[Any] = []
+    _collect_statistics_leaves(stats, cleaned, slots, values)
+    
+    arr = None
+    # A float64 cast would turn datetime64/timedelta64 leaves into epoch counts, which
+    # sanitize_numeric rejects; leave those to the per-value path
+    if not any(map(_is_numpy_temporal, values)):
+        try:
+            arr = np.asarray(values, dtype=np.float64)
+        except (ValueError, TypeError):
+            arr = None
+    if arr is None or arr.ndim != 1:
+        # Non-scalar, non-numeric or temporal leaves present; sanitize each value individually
+        arr = np.fromiter(
+            (v if v is not None else np.nan for v in map(sanitize_numeric, values)),
+            dtype=np.float64,
+            count=len(values)
+        )
+    arr[~np.isfinite(arr)] = 0.0
+    
+    for (target, key), value in zip(slots, arr.tolist()):
+        target[key] = value
     return cleaned
 
+# Parsed ISO timestamp strings remembered across calls; timestamps recur often
+ISO_PARSE_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=ISO_PARSE_CACHE_SIZE)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO 8601 string, accepting a trailing 'Z' for UTC."""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
 def validate_datetime(value: Any) -> Optional[datetime]:
     """
     Validate and convert datetime values.
@@ -74,10 +127,15 @@ def validate_datetime(value: Any) -> Optional[datetime]:
         return value
         
     try:
-        if isinstance(value, (np.datetime64, pd.Timestamp)):
+        if isinstance(value, np.datetime64):
+            # Microsecond precision converts straight to datetime (NaT becomes None);
+            # values outside datetime's year range come back as plain integers
+            result = value.astype('datetime64[us]').astype(object)
+            return result if isinstance(result, datetime) else None
+        elif isinstance(value, pd.Timestamp):
             return value.to_pydatetime()
         elif isinstance(value, str):
-            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+            return _parse_iso(value)
         return None
     except (ValueError, TypeError):
         return None 
\ No newline at end of file